@@ -0,0 +1,52 @@
+"""Serve both URL schemes from one process.
+
+tax_rate_api.py's routes take precedence; requests none of them match
+(e.g. /api/<year>/<state_code>/<filing_status>) fall through to
+tax-api.py. Each app serves its own data files, registered with the
+shared store in tax_store, so brackets both sets contain are compiled
+once into the same tables.
+"""
+import importlib.util
+import os
+
+from werkzeug.exceptions import NotFound
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_tax_api():
+    """Import tax-api.py, whose file name isn't a valid module name"""
+    spec = importlib.util.spec_from_file_location('tax_api', os.path.join(APP_DIR, 'tax-api.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class RouteDispatcher:
+    """WSGI app that sends each request to the first app with a matching route"""
+
+    def __init__(self, *apps):
+        self.apps = apps
+
+    def __call__(self, environ, start_response):
+        for app in self.apps[:-1]:
+            try:
+                app.url_map.bind_to_environ(environ).match()
+            except NotFound:
+                continue
+            except Exception:
+                # Method not allowed, redirects etc. are handled by the matching app
+                pass
+            return app(environ, start_response)
+
+        return self.apps[-1](environ, start_response)
+
+
+tax_api = load_tax_api()
+import tax_rate_api  # noqa: E402
+
+application = RouteDispatcher(tax_rate_api.app, tax_api.app)
+
+if __name__ == '__main__':
+    from werkzeug.serving import run_simple
+    run_simple('0.0.0.0', 5000, application, use_debugger=True, use_reloader=True)
@@ -0,0 +1,25 @@
+"""ASGI entry point for production serving.
+
+Wraps the combined WSGI app from app.py so an ASGI server can hold
+thousands of idle keep-alive connections on its event loop, while the
+Flask handlers (short, CPU-bound lookups) run on a small thread pool in
+each worker:
+
+    gunicorn -c gunicorn.conf.py asgi:application
+
+or, without gunicorn as process manager:
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000 --workers 4
+
+Requires `pip install gunicorn uvicorn[standard] a2wsgi`.
+"""
+import os
+
+from a2wsgi import WSGIMiddleware
+
+from app import application as wsgi_application
+
+# Threads per worker process running the Flask handlers
+THREADS = int(os.environ.get('TAX_API_THREADS', '8'))
+
+application = WSGIMiddleware(wsgi_application, workers=THREADS)
@@ -0,0 +1,301 @@
+"""Benchmark the calculation engine, data loading and every route.
+
+Reports throughput and latency percentiles for each benchmark, and can
+save the results as a baseline or compare against a saved one:
+
+    python benchmarks/bench.py                      # run everything
+    python benchmarks/bench.py -k calculate         # only names containing "calculate"
+    python benchmarks/bench.py --save main          # write benchmarks/baselines/main.json
+    python benchmarks/bench.py --compare main       # exit 1 on regressions
+
+The apps run against a fresh copy of the seed data in a temporary
+directory, so benchmarking never touches ./data.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DIR = os.path.join(REPO_DIR, 'benchmarks', 'baselines')
+
+# A benchmark regresses when its throughput drops by more than this fraction
+TOLERANCE = 0.20
+
+
+def summarize(samples, ops_per_sample=1):
+    """Throughput and latency percentiles from per-sample durations in seconds"""
+    per_call = sorted(s / ops_per_sample for s in samples)
+
+    def percentile(p):
+        return per_call[min(len(per_call) - 1, int(p / 100 * len(per_call)))] * 1e6
+
+    return {
+        "ops_per_sec": len(per_call) / sum(per_call),
+        "p50_us": percentile(50),
+        "p95_us": percentile(95),
+        "p99_us": percentile(99),
+        "mean_us": statistics.fmean(per_call) * 1e6,
+    }
+
+
+def measure(fn, samples, repeat=1, warmup=50, items=1):
+    """Time `samples` samples of `repeat` calls to fn().
+
+    Sub-microsecond calls are repeated within a sample so timer overhead
+    doesn't dominate; `items` reports a call that processes many items
+    (e.g. a batch) per item.
+    """
+    for _ in range(warmup):
+        fn()
+
+    timings = []
+    perf_counter = time.perf_counter
+    for _ in range(samples):
+        start = perf_counter()
+        for _ in range(repeat):
+            fn()
+        timings.append(perf_counter() - start)
+    return summarize(timings, repeat * items)
+
+
+def engine_benchmarks(tax_rate_api, samples):
+    from tax_engine import BracketTable, FEDERAL
+
+    snapshot = tax_rate_api.store.datasets[tax_rate_api.DATA_SOURCE]
+    table = snapshot.find_table(FEDERAL, '2024', 'single')
+    raw_brackets = table.to_brackets()
+    incomes = [random.uniform(0, 500000) for _ in range(10000)]
+
+    yield 'engine.tax', lambda: measure(lambda: table.tax(75000.0), samples, repeat=100)
+    yield 'engine.calculate_tax_raw_brackets', lambda: measure(
+        lambda: tax_rate_api.calculate_tax(75000.0, raw_brackets), samples, repeat=10)
+    yield 'engine.compile_brackets', lambda: measure(
+        lambda: BracketTable.from_brackets(raw_brackets), samples, repeat=10)
+
+    # Per-income figures, so they compare directly with engine.tax
+    records = [{"income": x, "state": "CA"} for x in incomes]
+    yield 'engine.tax_many_10k', lambda: measure(
+        lambda: table.tax_many(incomes), max(samples // 100, 5), warmup=2, items=len(incomes))
+    yield 'engine.calculate_records_10k', lambda: measure(
+        lambda: tax_rate_api.calculate_records(snapshot, records), max(samples // 100, 5), warmup=2,
+        items=len(records))
+
+
+def loading_benchmarks(tax_rate_api, tax_api, samples):
+    slow_samples = max(samples // 20, 5)
+    yield 'load.tax_rate_api.load_tax_data', lambda: measure(tax_rate_api.load_tax_data, slow_samples, warmup=2)
+    yield 'load.tax-api.load_tax_data', lambda: measure(tax_api.load_tax_data, slow_samples, warmup=2)
+    yield 'load.store_reload', lambda: measure(tax_rate_api.store.reload, slow_samples, warmup=2)
+
+
+# (name, app, method, url, body): a JSON body, or bytes sent as they are
+def routes(tax_rate_api, tax_api):
+    batch = [{"income": 1000 * i + 500, "state": "CA" if i % 2 else None} for i in range(100)]
+    keys = [{"state": state, "year": "2024", "filing_status": "single"} for state in ("CA", "NY", "IL", None)]
+    stream = ''.join(json.dumps(record) + '\n' for record in batch).encode()
+    version = tax_rate_api.store.datasets[tax_rate_api.DATA_SOURCE].version
+    return [
+        ('route.home', tax_rate_api, 'GET', '/', None),
+        ('route.get_federal_rates', tax_rate_api, 'GET', '/api/federal/2024/single', None),
+        ('route.get_state_rates', tax_rate_api, 'GET', '/api/state/CA/2024/single', None),
+        ('route.get_rates_batch', tax_rate_api, 'POST', '/api/rates/batch', keys),
+        ('route.calculate_federal_tax', tax_rate_api, 'GET', '/api/calculate/federal?income=75000', None),
+        ('route.calculate_state_tax', tax_rate_api, 'GET', '/api/calculate/state?state=CA&income=75000', None),
+        ('route.calculate_all_states_tax', tax_rate_api, 'GET', '/api/calculate/states?income=75000', None),
+        ('route.calculate_total_tax', tax_rate_api, 'GET', '/api/calculate/total?state=CA&income=75000', None),
+        ('route.calculate_marginal_rate', tax_rate_api, 'GET', '/api/calculate/marginal?state=CA&income=75000', None),
+        ('route.calculate_gross_federal', tax_rate_api, 'GET', '/api/calculate/gross/federal?net=60000', None),
+        ('route.calculate_gross_state', tax_rate_api, 'GET', '/api/calculate/gross/state?state=CA&net=60000', None),
+        ('route.calculate_gross_total', tax_rate_api, 'GET', '/api/calculate/gross/total?state=CA&net=60000', None),
+        ('route.calculate_batch_100', tax_rate_api, 'POST', '/api/calculate/batch', batch),
+        ('route.calculate_stream_100', tax_rate_api, 'POST', '/api/calculate/stream', stream),
+        ('route.get_states', tax_rate_api, 'GET', '/api/states', None),
+        ('route.get_years', tax_rate_api, 'GET', '/api/years', None),
+        ('route.get_snapshot', tax_rate_api, 'GET', '/api/snapshot', None),
+        ('route.get_snapshot_json', tax_rate_api, 'GET', f'/api/snapshot/{version}.json', None),
+        ('route.get_snapshot_bin', tax_rate_api, 'GET', f'/api/snapshot/{version}.bin', None),
+        ('route.get_changes', tax_rate_api, 'GET', f'/api/changes?since={version}', None),
+        ('route.tax-api.home', tax_api, 'GET', '/', None),
+        ('route.tax-api.get_rates', tax_api, 'GET', '/api/2024/CA/single', None),
+        ('route.tax-api.get_rates_batch', tax_api, 'POST', '/api/rates', [key for key in keys if key["state"]]),
+        ('route.tax-api.get_states', tax_api, 'GET', '/api/2024/states', None),
+        ('route.tax-api.get_years', tax_api, 'GET', '/api/years', None),
+    ]
+
+
+def open_route(client, method, url, body):
+    """The route's response, read to the end so streamed bodies are produced too"""
+    if isinstance(body, bytes):
+        response = client.open(url, method=method, data=body)
+    else:
+        response = client.open(url, method=method, json=body)
+    response.get_data()
+    return response
+
+
+def route_benchmarks(tax_rate_api, tax_api, samples):
+    def route(module, method, url, body):
+        client = module.app.test_client()
+
+        def call():
+            response = open_route(client, method, url, body)
+            # /api/snapshot answers with a redirect to the current version
+            assert response.status_code in (200, 302), (url, response.status_code)
+
+        return lambda: measure(call, samples)
+
+    for name, module, method, url, body in routes(tax_rate_api, tax_api):
+        yield name, route(module, method, url, body)
+
+    client = tax_rate_api.app.test_client()
+    update = {"ZZ": {"2024": {"single": [{"bracket": 0, "rate": 0.01}]}}}
+    yield 'route.update_state_rates', lambda: measure(
+        lambda: client.post('/api/update/state', json=update), max(samples // 20, 5), warmup=2)
+
+
+def concurrent_update_benchmarks(tax_rate_api, duration):
+    results = {}
+
+    def run_once():
+        if not results:
+            results.update(concurrent_updates(tax_rate_api, duration))
+        return results
+
+    yield 'concurrent.reads_during_updates', lambda: run_once()['reads']
+    yield 'concurrent.updates_during_reads', lambda: run_once()['updates']
+
+
+def concurrent_updates(tax_rate_api, duration, readers=4):
+    """Read latency while one thread keeps publishing updates"""
+    stop = threading.Event()
+    read_timings = [[] for _ in range(readers)]
+    update_timings = []
+
+    def reader(timings):
+        client = tax_rate_api.app.test_client()
+        urls = ['/api/calculate/total?state=CA&income=75000', '/api/state/CA/2024/single']
+        i = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            client.get(urls[i % len(urls)])
+            timings.append(time.perf_counter() - start)
+            i += 1
+
+    def writer():
+        client = tax_rate_api.app.test_client()
+        i = 0
+        while not stop.is_set():
+            update = {"ZZ": {"2024": {"single": [{"bracket": 0, "rate": (i % 100) / 1000}]}}}
+            start = time.perf_counter()
+            client.post('/api/update/state', json=update)
+            update_timings.append(time.perf_counter() - start)
+            i += 1
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=reader, args=(timings,)) for timings in read_timings]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    reads = [t for timings in read_timings for t in timings]
+    read_summary = summarize(reads)
+    # Aggregate throughput across reader threads rather than per-thread
+    read_summary["ops_per_sec"] = len(reads) / duration
+    return {"reads": read_summary, "updates": summarize(update_timings)}
+
+
+def run(selected, samples, duration, workdir):
+    os.chdir(workdir)
+    os.environ['TAX_DATA_RELOAD_INTERVAL'] = '0'
+    sys.path.insert(0, REPO_DIR)
+
+    import app
+    tax_rate_api, tax_api = app.tax_rate_api, app.tax_api
+
+    groups = [
+        engine_benchmarks(tax_rate_api, samples),
+        loading_benchmarks(tax_rate_api, tax_api, samples),
+        route_benchmarks(tax_rate_api, tax_api, samples),
+        concurrent_update_benchmarks(tax_rate_api, duration),
+    ]
+
+    results = {}
+    for group in groups:
+        for name, benchmark in group:
+            if selected and not any(s in name for s in selected):
+                continue
+            result = results[name] = benchmark()
+            print(f"{name:<40} {result['ops_per_sec']:>12,.0f} ops/s  p50 {result['p50_us']:>9.2f} us  "
+                  f"p95 {result['p95_us']:>9.2f} us  p99 {result['p99_us']:>9.2f} us", flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print throughput changes against a baseline; returns the regressed names"""
+    regressions = []
+    print(f"\nCompared with baseline ({baseline['meta']['python']}, {baseline['meta']['created']}):")
+    for name, result in results.items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        change = result['ops_per_sec'] / before['ops_per_sec'] - 1
+        flag = ''
+        if change < -tolerance:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"{name:<40} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-k', dest='selected', action='append', default=[],
+                        help='only run benchmarks whose name contains this (repeatable)')
+    parser.add_argument('--samples', type=int, default=2000, help='samples per benchmark')
+    parser.add_argument('--duration', type=float, default=3.0,
+                        help='seconds to run the concurrent update benchmark')
+    parser.add_argument('--save', metavar='NAME', help='save results as benchmarks/baselines/NAME.json')
+    parser.add_argument('--compare', metavar='NAME', help='compare with benchmarks/baselines/NAME.json')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help='allowed fractional throughput drop before flagging a regression')
+    args = parser.parse_args()
+
+    random.seed(0)
+    with tempfile.TemporaryDirectory(prefix='tax-bench-') as workdir:
+        results = run(args.selected, args.samples, args.duration, workdir)
+        os.chdir(REPO_DIR)
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f'{args.save}.json')
+        meta = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        with open(path, 'w') as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2, sort_keys=True)
+        print(f"\nSaved baseline to {path}")
+
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f'{args.compare}.json')) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
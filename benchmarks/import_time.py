@@ -0,0 +1,71 @@
+"""Check that importing each app stays within its import-time budget.
+
+Each module is imported in a fresh interpreter, with Flask already
+imported so only the app's own startup is measured. Data files are
+seeded by a warm-up run first, matching a normal worker start.
+
+    python benchmarks/import_time.py [--runs 7] [--budget-ms 30]
+
+Exits with status 1 if any module's median import time is over budget.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Median milliseconds allowed for importing each app module
+BUDGET_MS = 30
+
+# App modules by name; tax-api.py isn't importable by name, so both are loaded from their files
+MODULES = {
+    'tax_rate_api': 'tax_rate_api.py',
+    'tax-api': 'tax-api.py',
+}
+
+TIMER = """
+import importlib.util, sys, time
+sys.path.insert(0, {repo!r})
+import flask
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location({name!r}, {path!r})
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+print(time.perf_counter() - start)
+"""
+
+
+def import_time_ms(name, filename, workdir):
+    code = TIMER.format(repo=REPO_DIR, name=name.replace('-', '_'), path=os.path.join(REPO_DIR, filename))
+    env = dict(os.environ, TAX_DATA_RELOAD_INTERVAL='0')
+    output = subprocess.run([sys.executable, '-c', code], cwd=workdir, env=env,
+                            check=True, capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1]) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS)
+    args = parser.parse_args()
+
+    over_budget = False
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, filename in MODULES.items():
+            # Warm-up run seeds data/ so later runs measure a normal start
+            import_time_ms(name, filename, workdir)
+            times = [import_time_ms(name, filename, workdir) for _ in range(args.runs)]
+
+            median = statistics.median(times)
+            status = 'ok' if median <= args.budget_ms else 'OVER BUDGET'
+            over_budget = over_budget or median > args.budget_ms
+            print(f"{name:<14} median {median:7.2f} ms  min {min(times):7.2f} ms  "
+                  f"budget {args.budget_ms:.0f} ms  {status}")
+
+    return 1 if over_budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""Gunicorn settings for serving asgi:application in production.
+
+    gunicorn -c gunicorn.conf.py asgi:application
+
+Every setting can be overridden with the environment variable named
+next to it, or on the gunicorn command line.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get('TAX_API_BIND', '0.0.0.0:5000')
+
+# Handlers are CPU-bound and sub-millisecond, so one process per core
+# (the GIL limits each process to one core) with a few threads each
+workers = int(os.environ.get('TAX_API_WORKERS', multiprocessing.cpu_count()))
+worker_class = 'uvicorn.workers.UvicornWorker'
+
+# Import the apps and compile the dataset once in the master; workers
+# inherit it copy-on-write instead of each parsing data/*.json
+preload_app = os.environ.get('TAX_API_PRELOAD', '1') != '0'
+
+# Connections wait in the kernel backlog rather than being refused during bursts
+backlog = int(os.environ.get('TAX_API_BACKLOG', '4096'))
+
+# Keep idle client connections open; they cost the event loop almost nothing
+keepalive = int(os.environ.get('TAX_API_KEEPALIVE', '75'))
+
+timeout = 30
+graceful_timeout = 30
+
+# Recycle workers now and then to bound any slow memory growth
+max_requests = 100000
+max_requests_jitter = 10000
+
+
+def pre_fork(server, worker):
+    # Move everything the master built into the permanent generation, so
+    # collections in the workers never write to (and so copy) its pages
+    gc.freeze()
@@ -0,0 +1,327 @@
+import json
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+# NumPy is optional and slow to import, so it is only loaded by the first
+# multi-income call; without it those paths fall back to pure Python
+np = None
+_numpy_missing = False
+
+# Below this many incomes the NumPy call overhead outweighs the vectorized lookup
+VECTORIZE_MIN = 32
+
+# Jurisdiction key for federal brackets in the compiled tables
+FEDERAL = 'US'
+
+# Upper bound that tax-api.py's layout uses for the open-ended top bracket
+TOP_THRESHOLD = 999999999
+
+# Binary snapshots start with this, then a little-endian uint32 header length
+SNAPSHOT_MAGIC = b'TAXSNAP1'
+
+
+def _number(value):
+    """A float from a compact array as JSON would have it, e.g. 10000.0 -> 10000"""
+    return int(value) if value.is_integer() else value
+
+
+def load_numpy():
+    """Import NumPy on first use, returning None if it isn't installed"""
+    global np, _numpy_missing
+    if np is None and not _numpy_missing:
+        try:
+            import numpy
+        except ImportError:
+            _numpy_missing = True
+        else:
+            np = numpy
+    return np
+
+
+class BracketTable:
+    """Marginal tax brackets compiled into sorted boundary arrays.
+
+    The boundaries, rates and running totals are flat array('d') buffers
+    rather than lists of float objects: lookups never touch a per-element
+    refcount, so tables built before a fork stay shared with the workers
+    instead of being copied page by page.
+    """
+
+    __slots__ = ('starts', 'rates', 'top', 'base', '_arrays', '_net')
+
+    def __init__(self, starts, rates, top=None):
+        # starts[i] is the lower bound of bracket i (the first one always starts at 0)
+        self.starts = array('d', starts)
+        self.rates = array('d', rates)
+
+        # Explicit upper bound of the top bracket, kept only so the threshold
+        # layout round-trips when it isn't TOP_THRESHOLD
+        self.top = top
+
+        # base[i] is the tax owed on income exactly at starts[i]
+        base = [0] * len(starts)
+        for i in range(1, len(starts)):
+            base[i] = base[i - 1] + (starts[i] - starts[i - 1]) * rates[i - 1]
+        self.base = array('d', base)
+        self._arrays = None
+        self._net = None
+
+    @classmethod
+    def from_brackets(cls, brackets):
+        """Compile a list of {"bracket": lower_bound, "rate": rate} entries"""
+        ordered = sorted(brackets, key=lambda x: x["bracket"])
+        starts = [0] + [b["bracket"] for b in ordered[1:]]
+        rates = [b["rate"] for b in ordered]
+        return cls(starts, rates)
+
+    @classmethod
+    def from_thresholds(cls, brackets):
+        """Compile a list of {"threshold": upper_bound, "rate": rate} entries"""
+        ordered = sorted(brackets, key=lambda x: x["threshold"])
+        if not ordered:
+            return cls([0], [])
+
+        starts = [0] + [b["threshold"] for b in ordered[:-1]]
+        rates = [b["rate"] for b in ordered]
+        top = ordered[-1]["threshold"]
+        return cls(starts, rates, None if top == TOP_THRESHOLD else top)
+
+    @classmethod
+    def combine(cls, *tables):
+        """One table taxing each dollar at the sum of the tables' rates (e.g. federal plus state)"""
+        starts = sorted(set().union(*(table.starts for table in tables)))
+        rates = [sum(table.marginal_rate(start) for table in tables) for start in starts]
+        return cls(starts, rates)
+
+    def to_brackets(self):
+        """Brackets in tax_rate_api.py's lower-bound layout"""
+        return [{"bracket": _number(start), "rate": rate} for start, rate in zip(self.starts, self.rates)]
+
+    def to_thresholds(self):
+        """Brackets in tax-api.py's upper-bound layout"""
+        uppers = [_number(start) for start in self.starts[1:len(self.rates)]]
+        uppers.append(TOP_THRESHOLD if self.top is None else self.top)
+        return [{"threshold": upper, "rate": rate} for upper, rate in zip(uppers, self.rates)]
+
+    def key(self):
+        """Hashable identity of the brackets, used to share identical tables"""
+        return (tuple(self.starts), tuple(self.rates), self.top)
+
+    def tax(self, income):
+        """Tax owed on income: one bisect plus one multiply-add"""
+        if not self.rates:
+            return 0
+
+        # Income sitting exactly on a boundary belongs to the lower bracket
+        i = bisect_left(self.starts, income, 1) - 1
+        return self.base[i] + (income - self.starts[i]) * self.rates[i]
+
+    def bracket_index(self, income):
+        """Index of the bracket that taxes the next dollar earned above income"""
+        return max(bisect_right(self.starts, income) - 1, 0)
+
+    def marginal_rate(self, income):
+        """Rate applied to the next dollar earned above income"""
+        if not self.rates:
+            return 0
+        return self.rates[self.bracket_index(income)]
+
+    def income_for_net(self, net):
+        """Income left with net after tax, or None if no income is (rates of 100% or more).
+
+        Income minus tax is piecewise linear with the same boundaries, so
+        this is one bisect over the after-tax amount at each boundary.
+        """
+        if not self.rates:
+            return net
+
+        if self._net is None:
+            self._net = array('d', [start - base for start, base in zip(self.starts, self.base)])
+
+        i = max(bisect_right(self._net, net) - 1, 0)
+        if self.rates[i] >= 1:
+            return None
+        return self.starts[i] + (net - self._net[i]) / (1 - self.rates[i])
+
+    def bracket_bounds(self, income):
+        """(lower, upper) bounds of the bracket taxing the next dollar above income.
+
+        upper is None for the open-ended top bracket.
+        """
+        if not self.rates:
+            return 0, None
+
+        i = self.bracket_index(income)
+        upper = _number(self.starts[i + 1]) if i + 1 < len(self.rates) else None
+        return _number(self.starts[i]), upper
+
+    def tax_many(self, incomes):
+        """Tax owed on each income in a sequence, vectorized when NumPy is available"""
+        if not self.rates:
+            return [0] * len(incomes)
+
+        if len(incomes) < VECTORIZE_MIN or load_numpy() is None:
+            return [self.tax(income) for income in incomes]
+
+        return self.tax_array(incomes).tolist()
+
+    def tax_array(self, incomes):
+        """Tax owed on an array of incomes as a NumPy array (requires NumPy)"""
+        np = load_numpy()
+        if self._arrays is None:
+            # Zero-copy views of the compact buffers
+            self._arrays = tuple(np.frombuffer(values, dtype=np.float64)
+                                 for values in (self.starts, self.rates, self.base))
+        starts, rates, base = self._arrays
+
+        incomes = np.asarray(incomes, dtype=np.float64)
+        if not len(rates):
+            return np.zeros_like(incomes)
+
+        # Same boundary rule as tax(): searchsorted(side='left') mirrors bisect_left
+        i = np.searchsorted(starts, incomes, side='left') - 1
+        np.maximum(i, 0, out=i)
+        return base[i] + (incomes - starts[i]) * rates[i]
+
+
+# The compiled representation shared by both apps is a nested dict,
+# jurisdiction -> year -> filing status -> BracketTable, with federal
+# brackets under FEDERAL. Non-list entries such as a year's "note" are
+# kept as they are. The arrange_* functions nest each app's data the same
+# way, with the bracket lists as stored, so lookups can serve them as is.
+
+def arrange_bracket_layout(federal_tax_rates, state_tax_rates):
+    """Nest tax_rate_api.py's federal and state data by jurisdiction"""
+    tables = {FEDERAL: federal_tax_rates}
+    tables.update(state_tax_rates)
+    return tables
+
+
+def arrange_threshold_layout(tax_rates):
+    """Nest tax-api.py's year -> jurisdiction data by jurisdiction"""
+    tables = {}
+    for year, jurisdictions in tax_rates.items():
+        for jurisdiction, statuses in jurisdictions.items():
+            tables.setdefault(jurisdiction, {})[year] = statuses
+    return tables
+
+
+def compile_bracket_layout(federal_tax_rates, state_tax_rates, shared=None):
+    """Compile tax_rate_api.py's federal and state data (lower-bound brackets)"""
+    tables = arrange_bracket_layout(federal_tax_rates, state_tax_rates)
+    return _compile(tables, BracketTable.from_brackets, {} if shared is None else shared)
+
+
+def compile_threshold_layout(tax_rates, shared=None):
+    """Compile tax-api.py's year -> jurisdiction data (upper-bound thresholds)"""
+    tables = arrange_threshold_layout(tax_rates)
+    return _compile(tables, BracketTable.from_thresholds, {} if shared is None else shared)
+
+
+def _compile(tables, compile_brackets, shared):
+    compiled = {}
+    for jurisdiction, years in tables.items():
+        compiled[jurisdiction] = {}
+        for year, statuses in years.items():
+            entry = {}
+            for filing_status, brackets in statuses.items():
+                if isinstance(brackets, list):
+                    # Identical bracket sets (e.g. flat taxes) share one table
+                    table = compile_brackets(brackets)
+                    brackets = shared.setdefault(table.key(), table)
+                entry[filing_status] = brackets
+            compiled[jurisdiction][year] = entry
+    return compiled
+
+
+def bracket_layout(tables):
+    """Convert compiled tables back to tax_rate_api.py's (federal, state) data"""
+    layout = {}
+    for jurisdiction, years in tables.items():
+        layout[jurisdiction] = {
+            year: {filing_status: table.to_brackets() if isinstance(table, BracketTable) else table
+                   for filing_status, table in entry.items()}
+            for year, entry in years.items()
+        }
+    federal_tax_rates = layout.pop(FEDERAL, {})
+    return federal_tax_rates, layout
+
+
+def threshold_layout(tables):
+    """Convert compiled tables back to tax-api.py's year -> jurisdiction data"""
+    layout = {}
+    for jurisdiction, years in tables.items():
+        for year, entry in years.items():
+            layout.setdefault(year, {})[jurisdiction] = {
+                filing_status: table.to_thresholds() if isinstance(table, BracketTable) else table
+                for filing_status, table in entry.items()
+            }
+    return layout
+
+
+def pack_tables(tables, version):
+    """Encode compiled tables as a compact binary snapshot.
+
+    The layout is SNAPSHOT_MAGIC, a little-endian uint32 length, a JSON
+    header, then the little-endian float64 starts and rates of each
+    distinct table. The header holds the version, [offset, starts, rates,
+    top] for each table (offsets count float64 values), and the nested
+    jurisdiction -> year -> filing status entries: a table number, or any
+    other value (e.g. a note) as is.
+    """
+    numbers = {}
+    layout = []
+    values = array('d')
+
+    def table_number(table):
+        if id(table) not in numbers:
+            numbers[id(table)] = len(layout)
+            layout.append([len(values), len(table.starts), len(table.rates), table.top])
+            values.extend(table.starts)
+            values.extend(table.rates)
+        return numbers[id(table)]
+
+    entries = {
+        jurisdiction: {
+            year: {filing_status: table_number(table) if isinstance(table, BracketTable) else table
+                   for filing_status, table in entry.items()}
+            for year, entry in years.items()
+        }
+        for jurisdiction, years in tables.items()
+    }
+
+    header = json.dumps({"version": version, "tables": layout, "entries": entries},
+                        separators=(',', ':')).encode()
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return SNAPSHOT_MAGIC + struct.pack('<I', len(header)) + header + values.tobytes()
+
+
+def unpack_tables(data):
+    """Decode a pack_tables() snapshot, returning (version, tables)"""
+    if not data.startswith(SNAPSHOT_MAGIC):
+        raise ValueError("Not a tax data snapshot")
+
+    start = len(SNAPSHOT_MAGIC) + 4
+    (length,) = struct.unpack_from('<I', data, len(SNAPSHOT_MAGIC))
+    header = json.loads(data[start:start + length])
+
+    values = array('d', data[start + length:])
+    if sys.byteorder == 'big':
+        values.byteswap()
+
+    compiled = [BracketTable(values[offset:offset + starts],
+                             values[offset + starts:offset + starts + rates], top)
+                for offset, starts, rates, top in header["tables"]]
+
+    tables = {
+        jurisdiction: {
+            year: {filing_status: compiled[value] if isinstance(value, int) else value
+                   for filing_status, value in entry.items()}
+            for year, entry in years.items()
+        }
+        for jurisdiction, years in header["entries"].items()
+    }
+    return header["version"], tables
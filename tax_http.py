@@ -0,0 +1,425 @@
+import cProfile
+import gzip
+import hmac
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+
+from flask import current_app, g, jsonify, request
+
+
+class Metrics:
+    """Request, latency and cache counters, rendered in Prometheus text format.
+
+    Recording is a perf_counter() pair, a bisect and a few dict
+    increments under one lock, which keeps the per-request cost in the
+    low microseconds.
+    """
+
+    # Upper bounds in seconds of the request latency histogram buckets
+    BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.latency = {}
+        self.caches = {}
+
+    def observe(self, labels, status, seconds):
+        """Record one request; labels is (app, route, method)"""
+        bucket = bisect_left(self.BUCKETS, seconds)
+        with self.lock:
+            key = labels + (status,)
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+            histogram = self.latency.get(labels[:2])
+            if histogram is None:
+                histogram = self.latency[labels[:2]] = [0] * (len(self.BUCKETS) + 1) + [0.0]
+            histogram[bucket] += 1
+            histogram[-1] += seconds
+
+    def count_cache(self, cache, hit):
+        key = (cache, 'hit' if hit else 'miss')
+        with self.lock:
+            self.caches[key] = self.caches.get(key, 0) + 1
+
+    def install(self, app, name):
+        """Time every request to app and serve /metrics from it"""
+
+        @app.before_request
+        def start_timer():
+            g.metrics_start = time.perf_counter()
+
+        @app.after_request
+        def record_request(response):
+            start = g.pop('metrics_start', None)
+            if start is not None:
+                self.observe((name, request.endpoint or 'unmatched', request.method),
+                             response.status_code, time.perf_counter() - start)
+            return response
+
+        app.add_url_rule('/metrics', 'metrics', self.respond)
+
+    def respond(self):
+        return current_app.response_class(self.render(), mimetype='text/plain; version=0.0.4')
+
+    def render(self):
+        with self.lock:
+            requests = dict(self.requests)
+            latency = {labels: list(histogram) for labels, histogram in self.latency.items()}
+            caches = dict(self.caches)
+
+        lines = [
+            '# HELP tax_api_requests_total Requests handled, by app, route, method and status.',
+            '# TYPE tax_api_requests_total counter',
+        ]
+        for (app, route, method, status), count in sorted(requests.items()):
+            lines.append(f'tax_api_requests_total{{app="{app}",route="{route}",method="{method}",status="{status}"}} {count}')
+
+        lines += [
+            '# HELP tax_api_request_errors_total Requests answered with a 4xx or 5xx status.',
+            '# TYPE tax_api_request_errors_total counter',
+        ]
+        errors = {}
+        for (app, route, method, status), count in requests.items():
+            if status >= 400:
+                errors[(app, route, status)] = errors.get((app, route, status), 0) + count
+        for (app, route, status), count in sorted(errors.items()):
+            lines.append(f'tax_api_request_errors_total{{app="{app}",route="{route}",status="{status}"}} {count}')
+
+        lines += [
+            '# HELP tax_api_request_duration_seconds Request latency by app and route.',
+            '# TYPE tax_api_request_duration_seconds histogram',
+        ]
+        for (app, route), histogram in sorted(latency.items()):
+            labels = f'app="{app}",route="{route}"'
+            cumulative = 0
+            for bound, count in zip(self.BUCKETS + ('+Inf',), histogram):
+                cumulative += count
+                lines.append(f'tax_api_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'tax_api_request_duration_seconds_sum{{{labels}}} {histogram[-1]}')
+            lines.append(f'tax_api_request_duration_seconds_count{{{labels}}} {cumulative}')
+
+        lines += [
+            '# HELP tax_api_cache_requests_total Internal cache lookups, by cache and result.',
+            '# TYPE tax_api_cache_requests_total counter',
+        ]
+        for (cache, result), count in sorted(caches.items()):
+            lines.append(f'tax_api_cache_requests_total{{cache="{cache}",result="{result}"}} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+# Shared by every app imported into this process
+metrics = Metrics()
+
+
+# Token that unlocks admin-only request features; unset disables them
+ADMIN_TOKEN = os.environ.get('TAX_API_ADMIN_TOKEN', '')
+
+# Where profiled requests write their cProfile stats
+PROFILE_DIR = os.environ.get('TAX_API_PROFILE_DIR', 'profiles')
+
+
+def is_admin():
+    """Whether the request carries the admin token"""
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+
+def install_profiler(app):
+    """Profile single requests on demand.
+
+    A request sent with `X-Profile: 1` and a valid `X-Admin-Token` runs
+    under cProfile; the stats are saved to PROFILE_DIR and the file name
+    is returned in the `X-Profile-File` response header. Profiled requests
+    bypass the result cache and never share another request's response, so
+    the stats cover the calculation. Other requests only pay for one header
+    lookup.
+    """
+
+    @app.before_request
+    def start_profile():
+        if 'X-Profile' not in request.headers:
+            return None
+        if not is_admin():
+            return jsonify({"error": "Profiling requires a valid X-Admin-Token"}), 403
+
+        g.profile = cProfile.Profile()
+        g.profile.enable()
+        return None
+
+    @app.after_request
+    def save_profile(response):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return response
+        profile.disable()
+
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        name = f"{request.endpoint or 'unmatched'}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{time.perf_counter_ns()}.prof"
+        profile.dump_stats(os.path.join(PROFILE_DIR, name))
+        response.headers['X-Profile-File'] = name
+        return response
+
+    @app.teardown_request
+    def stop_profile(exc):
+        # after_request is skipped when a handler raises in debug mode
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profile.disable()
+
+
+# Bodies smaller than this are served uncompressed; compression wouldn't pay for its headers
+COMPRESS_MIN_BYTES = 256
+
+# Brotli is optional; without it cached bodies are offered gzip-compressed only
+brotli = None
+_brotli_missing = False
+
+
+def load_brotli():
+    """Import brotli on first use, returning None if it isn't installed"""
+    global brotli, _brotli_missing
+    if brotli is None and not _brotli_missing:
+        try:
+            import brotli as module
+        except ImportError:
+            _brotli_missing = True
+        else:
+            brotli = module
+    return brotli
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return load_brotli().compress(body)
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+class ResponseCache:
+    """Encoded JSON response bodies, valid for a single dataset version.
+
+    Keys are scoped to the serving app, so apps sharing one dataset can
+    use the same keys for their differently shaped payloads. Bodies are
+    also kept compressed for each encoding a client has asked for, so
+    compression runs once per key and dataset version.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.bodies = {}
+        self.compressed = {}
+
+    def lookup(self, key, build):
+        """The encoded body for key, building it on first use; returns (body, status).
+
+        build() returns (payload, status); only successful payloads are
+        cached, so unknown keys cannot grow the cache.
+        """
+        key = (current_app.name, key)
+        body = self.bodies.get(key)
+        metrics.count_cache('responses', body is not None)
+        if body is not None:
+            return body, 200
+
+        payload, status = build()
+        body = jsonify(payload).get_data()
+        if status == 200:
+            self.bodies[key] = body
+        return body, status
+
+    def respond(self, key, build):
+        """Serve the cached body for key, building it on first use"""
+        body, status = self.lookup(key, build)
+        response = current_app.response_class(body, status=status, mimetype='application/json')
+        if status != 200:
+            return response
+
+        # Each encoding is a separate representation with its own ETag
+        etag = self.version
+        response.vary.add('Accept-Encoding')
+        encodings = ('br', 'gzip') if load_brotli() is not None else ('gzip',)
+        encoding = request.accept_encodings.best_match(encodings)
+        if encoding is not None:
+            encoded = self.compressed_body((current_app.name, key, encoding), body, encoding)
+            if encoded is not None:
+                response.set_data(encoded)
+                response.content_encoding = encoding
+                etag = f'{self.version}-{encoding}'
+
+        response.set_etag(etag)
+        return response.make_conditional(request)
+
+    def compressed_body(self, key, body, encoding):
+        """body compressed with encoding, or None if that doesn't make it smaller"""
+        try:
+            encoded = self.compressed[key]
+        except KeyError:
+            pass
+        else:
+            metrics.count_cache('compressed', True)
+            return encoded
+
+        metrics.count_cache('compressed', False)
+        encoded = compress(body, encoding) if len(body) >= COMPRESS_MIN_BYTES else None
+        if encoded is not None and len(encoded) >= len(body):
+            encoded = None
+        self.compressed[key] = encoded
+        return encoded
+
+    def respond_many(self, requests):
+        """Serve {"results": [...]} for an iterable of (key, build) pairs.
+
+        Cached bodies are spliced in as bytes, so keys already served by
+        the single-key routes cost no encoding at all.
+        """
+        bodies = [self.lookup(key, build)[0].rstrip() for key, build in requests]
+        body = b'{"results":[' + b','.join(bodies) + b']}\n'
+        return current_app.response_class(body, mimetype='application/json')
+
+
+# Memory bound of each dataset's result cache in megabytes; 0 disables it
+RESULT_CACHE_MB = float(os.environ.get('TAX_API_RESULT_CACHE_MB', '16'))
+
+# Seconds a cached result is served for; 0 keeps it until evicted or the data changes
+RESULT_CACHE_TTL = float(os.environ.get('TAX_API_RESULT_CACHE_TTL', '0'))
+
+
+class SingleFlight:
+    """Runs concurrent calls that share a key once, handing every caller the same result"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn):
+        """fn() for the first caller with key; later callers wait for its result.
+
+        Returns (result, shared), where shared is True for callers that
+        waited on another thread's call.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                # [done, result, exception]
+                call = self.calls[key] = [threading.Event(), None, None]
+
+        if not leader:
+            call[0].wait()
+            if call[2] is not None:
+                raise call[2]
+            return call[1], True
+
+        try:
+            call[1] = fn()
+        except BaseException as e:
+            call[2] = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call[0].set()
+        return call[1], False
+
+
+def request_key(params=None):
+    """Identity of the current request's inputs: app, path, query arguments and body.
+
+    With params (query parameter name -> type), only those parameters,
+    parsed the way the view parses them, identify the request.
+    """
+    if params is None:
+        return (current_app.name, request.path, tuple(sorted(request.args.items(multi=True))), request.get_data())
+    return (current_app.name, request.path) + tuple(request.args.get(name, type=parse)
+                                                    for name, parse in params.items())
+
+
+class ResultCache:
+    """LRU cache of successful calculate responses, valid for a single dataset version.
+
+    Entries are keyed by app, path and the query parameters the view
+    reads, parsed, so repeated requests for the same income, state, year
+    and filing status skip the calculation and the JSON encoding, whatever
+    other parameters they carry. The cache holds at most max_bytes of
+    response bodies and keys (plus a per-entry allowance), evicting the
+    least recently used entries first.
+
+    Identical requests arriving while a result is being built wait for
+    that build and share its encoded body instead of repeating the work.
+    """
+
+    # Rough bytes per entry besides the body: key tuple, OrderedDict node, entry tuple
+    ENTRY_OVERHEAD = 400
+
+    def __init__(self, max_bytes=int(RESULT_CACHE_MB * 1024 * 1024), ttl=RESULT_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.flights = SingleFlight()
+
+    def respond(self, build, params):
+        """Serve the cached response for this request, or build() and cache it.
+
+        params maps each query parameter build() reads to its type.
+        Profiled requests always build, so their stats show the real work.
+        """
+        if 'profile' in g:
+            return current_app.make_response(build())
+
+        key = request_key(params)
+        if self.max_bytes > 0:
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry is not None and entry[2] < time.monotonic():
+                    self._remove(key)
+                    entry = None
+                if entry is not None:
+                    self.entries.move_to_end(key)
+            metrics.count_cache('results', entry is not None)
+            if entry is not None:
+                return current_app.response_class(entry[0], mimetype=entry[1])
+
+        return self._shared_response(key, build, self._store)
+
+    def coalesce(self, build):
+        """Share build()'s response between concurrent identical requests, without caching it"""
+        if 'profile' in g:
+            return current_app.make_response(build())
+        return self._shared_response(request_key(), build)
+
+    def _shared_response(self, key, build, store=None):
+        def render():
+            response = current_app.make_response(build())
+            rendered = (response.get_data(), response.status_code, response.mimetype)
+            if store is not None and response.status_code == 200:
+                store(key, rendered)
+            return rendered
+
+        # Each caller gets its own response object; only the encoded body is shared
+        (body, status, mimetype), shared = self.flights.do(key, render)
+        metrics.count_cache('coalesced', shared)
+        return current_app.response_class(body, status=status, mimetype=mimetype)
+
+    def _store(self, key, rendered):
+        if self.max_bytes <= 0:
+            return
+
+        body, _, mimetype = rendered
+        expires = time.monotonic() + self.ttl if self.ttl > 0 else float('inf')
+        with self.lock:
+            if key not in self.entries:
+                # Strings in the key (path, state, year...) count toward the bound too
+                size = len(body) + self.ENTRY_OVERHEAD + sum(len(part) for part in key if isinstance(part, str))
+                self.entries[key] = (body, mimetype, expires, size)
+                self.size += size
+                while self.size > self.max_bytes and self.entries:
+                    self._remove(next(iter(self.entries)))
+
+    def _remove(self, key):
+        self.size -= self.entries.pop(key)[3]
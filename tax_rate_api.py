@@ -1,7 +1,13 @@
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, redirect, request, stream_with_context, url_for
+import csv
+import io
 import json
 import os
 
+from tax_engine import FEDERAL, BracketTable, arrange_bracket_layout, compile_bracket_layout
+from tax_http import install_profiler, metrics
+from tax_store import cached_result, coalesced, seed_data_file, store, write_json_atomic
+
 app = Flask(__name__)
 
 # Load tax data from JSON files
@@ -9,715 +15,9 @@ def load_tax_data():
     # Create data directory if it doesn't exist
     os.makedirs('data', exist_ok=True)
     
-    # Create federal tax data if it doesn't exist
-    if not os.path.exists('data/federal_tax_rates.json'):
-        federal_tax_data = {
-            "2024": {
-                "single": [
-                    {"bracket": 0, "rate": 0.10},
-                    {"bracket": 11000, "rate": 0.12},
-                    {"bracket": 44725, "rate": 0.22},
-                    {"bracket": 95375, "rate": 0.24},
-                    {"bracket": 182100, "rate": 0.32},
-                    {"bracket": 231250, "rate": 0.35},
-                    {"bracket": 578125, "rate": 0.37}
-                ],
-                "married_joint": [
-                    {"bracket": 0, "rate": 0.10},
-                    {"bracket": 22000, "rate": 0.12},
-                    {"bracket": 89450, "rate": 0.22},
-                    {"bracket": 190750, "rate": 0.24},
-                    {"bracket": 364200, "rate": 0.32},
-                    {"bracket": 462500, "rate": 0.35},
-                    {"bracket": 693750, "rate": 0.37}
-                ],
-                "head_of_household": [
-                    {"bracket": 0, "rate": 0.10},
-                    {"bracket": 15700, "rate": 0.12},
-                    {"bracket": 59850, "rate": 0.22},
-                    {"bracket": 95350, "rate": 0.24},
-                    {"bracket": 182100, "rate": 0.32},
-                    {"bracket": 231250, "rate": 0.35},
-                    {"bracket": 578100, "rate": 0.37}
-                ],
-                "married_separate": [
-                    {"bracket": 0, "rate": 0.10},
-                    {"bracket": 11000, "rate": 0.12},
-                    {"bracket": 44725, "rate": 0.22},
-                    {"bracket": 95375, "rate": 0.24},
-                    {"bracket": 182100, "rate": 0.32},
-                    {"bracket": 231250, "rate": 0.35},
-                    {"bracket": 346875, "rate": 0.37}
-                ]
-            }
-        }
-        with open('data/federal_tax_rates.json', 'w') as f:
-            json.dump(federal_tax_data, f, indent=2)
-    
-    # Create state tax data if it doesn't exist
-    if not os.path.exists('data/state_tax_rates.json'):
-        state_tax_data = {
-            "AL": {
-                "2024": {
-                    "note": "Alabama has a flat tax rate",
-                    "single": [
-                        {"bracket": 0, "rate": 0.05}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.05}
-                    ],
-                    "head_of_household": [
-                        {"bracket": 0, "rate": 0.05}
-                    ],
-                    "married_separate": [
-                        {"bracket": 0, "rate": 0.05}
-                    ]
-                }
-            },
-            "AK": {
-                "2024": {
-                    "note": "Alaska has no state income tax",
-                    "single": [
-                        {"bracket": 0, "rate": 0.0}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0}
-                    ],
-                    "head_of_household": [
-                        {"bracket": 0, "rate": 0.0}
-                    ],
-                    "married_separate": [
-                        {"bracket": 0, "rate": 0.0}
-                    ]
-                }
-            },
-            "AZ": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.0259},
-                        {"bracket": 28653, "rate": 0.0334},
-                        {"bracket": 57305, "rate": 0.0417},
-                        {"bracket": 171911, "rate": 0.045}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0259},
-                        {"bracket": 57305, "rate": 0.0334},
-                        {"bracket": 114610, "rate": 0.0417},
-                        {"bracket": 343821, "rate": 0.045}
-                    ]
-                }
-            },
-            "AR": {
-                "2024": {
-                    "note": "Arkansas has adjusted its rates for 2024",
-                    "single": [
-                        {"bracket": 0, "rate": 0.02},
-                        {"bracket": 4300, "rate": 0.04},
-                        {"bracket": 8500, "rate": 0.049}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.02},
-                        {"bracket": 4300, "rate": 0.04},
-                        {"bracket": 8500, "rate": 0.049}
-                    ]
-                }
-            },
-            "CA": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.01},
-                        {"bracket": 10099, "rate": 0.02},
-                        {"bracket": 23942, "rate": 0.04},
-                        {"bracket": 37788, "rate": 0.06},
-                        {"bracket": 52455, "rate": 0.08},
-                        {"bracket": 66295, "rate": 0.093},
-                        {"bracket": 338639, "rate": 0.103},
-                        {"bracket": 406364, "rate": 0.113},
-                        {"bracket": 677275, "rate": 0.123},
-                        {"bracket": 1000000, "rate": 0.133}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.01},
-                        {"bracket": 20198, "rate": 0.02},
-                        {"bracket": 47884, "rate": 0.04},
-                        {"bracket": 75576, "rate": 0.06},
-                        {"bracket": 104910, "rate": 0.08},
-                        {"bracket": 132590, "rate": 0.093},
-                        {"bracket": 677278, "rate": 0.103},
-                        {"bracket": 812728, "rate": 0.113},
-                        {"bracket": 1354550, "rate": 0.123},
-                        {"bracket": 2000000, "rate": 0.133}
-                    ]
-                }
-            },
-            "CO": {
-                "2024": {
-                    "note": "Colorado has a flat tax rate",
-                    "single": [
-                        {"bracket": 0, "rate": 0.0443}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0443}
-                    ]
-                }
-            },
-            "CT": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.03},
-                        {"bracket": 10000, "rate": 0.05},
-                        {"bracket": 50000, "rate": 0.055},
-                        {"bracket": 100000, "rate": 0.06},
-                        {"bracket": 200000, "rate": 0.065},
-                        {"bracket": 250000, "rate": 0.069},
-                        {"bracket": 500000, "rate": 0.0699}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.03},
-                        {"bracket": 20000, "rate": 0.05},
-                        {"bracket": 100000, "rate": 0.055},
-                        {"bracket": 200000, "rate": 0.06},
-                        {"bracket": 400000, "rate": 0.065},
-                        {"bracket": 500000, "rate": 0.069},
-                        {"bracket": 1000000, "rate": 0.0699}
-                    ]
-                }
-            },
-            "DE": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.0},
-                        {"bracket": 2000, "rate": 0.022},
-                        {"bracket": 5000, "rate": 0.039},
-                        {"bracket": 10000, "rate": 0.048},
-                        {"bracket": 20000, "rate": 0.052},
-                        {"bracket": 25000, "rate": 0.055},
-                        {"bracket": 60000, "rate": 0.066}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0},
-                        {"bracket": 2000, "rate": 0.022},
-                        {"bracket": 5000, "rate": 0.039},
-                        {"bracket": 10000, "rate": 0.048},
-                        {"bracket": 20000, "rate": 0.052},
-                        {"bracket": 25000, "rate": 0.055},
-                        {"bracket": 60000, "rate": 0.066}
-                    ]
-                }
-            },
-            "DC": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.04},
-                        {"bracket": 10000, "rate": 0.06},
-                        {"bracket": 40000, "rate": 0.065},
-                        {"bracket": 60000, "rate": 0.085},
-                        {"bracket": 350000, "rate": 0.0925},
-                        {"bracket": 1000000, "rate": 0.0975}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.04},
-                        {"bracket": 10000, "rate": 0.06},
-                        {"bracket": 40000, "rate": 0.065},
-                        {"bracket": 60000, "rate": 0.085},
-                        {"bracket": 350000, "rate": 0.0925},
-                        {"bracket": 1000000, "rate": 0.0975}
-                    ]
-                }
-            },
-            "FL": {
-                "2024": {
-                    "note": "Florida has no state income tax",
-                    "single": [
-                        {"bracket": 0, "rate": 0.0}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0}
-                    ]
-                }
-            },
-            "GA": {
-                "2024": {
-                    "note": "Georgia has a flat tax rate",
-                    "single": [
-                        {"bracket": 0, "rate": 0.0555}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0555}
-                    ]
-                }
-            },
-            "HI": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.014},
-                        {"bracket": 2400, "rate": 0.032},
-                        {"bracket": 4800, "rate": 0.055},
-                        {"bracket": 9600, "rate": 0.064},
-                        {"bracket": 14400, "rate": 0.068},
-                        {"bracket": 19200, "rate": 0.072},
-                        {"bracket": 24000, "rate": 0.076},
-                        {"bracket": 36000, "rate": 0.079},
-                        {"bracket": 48000, "rate": 0.0825},
-                        {"bracket": 150000, "rate": 0.09},
-                        {"bracket": 175000, "rate": 0.10},
-                        {"bracket": 200000, "rate": 0.11}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.014},
-                        {"bracket": 4800, "rate": 0.032},
-                        {"bracket": 9600, "rate": 0.055},
-                        {"bracket": 19200, "rate": 0.064},
-                        {"bracket": 28800, "rate": 0.068},
-                        {"bracket": 38400, "rate": 0.072},
-                        {"bracket": 48000, "rate": 0.076},
-                        {"bracket": 72000, "rate": 0.079},
-                        {"bracket": 96000, "rate": 0.0825},
-                        {"bracket": 300000, "rate": 0.09},
-                        {"bracket": 350000, "rate": 0.10},
-                        {"bracket": 400000, "rate": 0.11}
-                    ]
-                }
-            },
-            "ID": {
-                "2024": {
-                    "note": "Idaho has a flat tax rate",
-                    "single": [
-                        {"bracket": 0, "rate": 0.059}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.059}
-                    ]
-                }
-            },
-            "IL": {
-                "2024": {
-                    "note": "Illinois has a flat tax rate",
-                    "single": [
-                        {"bracket": 0, "rate": 0.0495}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0495}
-                    ]
-                }
-            },
-            "IN": {
-                "2024": {
-                    "note": "Indiana has a flat tax rate",
-                    "single": [
-                        {"bracket": 0, "rate": 0.0323}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0323}
-                    ]
-                }
-            },
-            "IA": {
-                "2024": {
-                    "note": "Iowa has a flat tax rate",
-                    "single": [
-                        {"bracket": 0, "rate": 0.0375}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0375}
-                    ]
-                }
-            },
-            "KS": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.031},
-                        {"bracket": 15000, "rate": 0.0525},
-                        {"bracket": 30000, "rate": 0.057}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.031},
-                        {"bracket": 30000, "rate": 0.0525},
-                        {"bracket": 60000, "rate": 0.057}
-                    ]
-                }
-            },
-            "KY": {
-                "2024": {
-                    "note": "Kentucky has a flat tax rate",
-                    "single": [
-                        {"bracket": 0, "rate": 0.044}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.044}
-                    ]
-                }
-            },
-            "LA": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.0185},
-                        {"bracket": 12500, "rate": 0.035},
-                        {"bracket": 50000, "rate": 0.0425}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0185},
-                        {"bracket": 25000, "rate": 0.035},
-                        {"bracket": 100000, "rate": 0.0425}
-                    ]
-                }
-            },
-            "ME": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.058},
-                        {"bracket": 24500, "rate": 0.0675},
-                        {"bracket": 58050, "rate": 0.0715}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.058},
-                        {"bracket": 49000, "rate": 0.0675},
-                        {"bracket": 116100, "rate": 0.0715}
-                    ]
-                }
-            },
-            "MD": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.02},
-                        {"bracket": 1000, "rate": 0.03},
-                        {"bracket": 2000, "rate": 0.04},
-                        {"bracket": 3000, "rate": 0.0475},
-                        {"bracket": 100000, "rate": 0.05},
-                        {"bracket": 125000, "rate": 0.0525},
-                        {"bracket": 150000, "rate": 0.055},
-                        {"bracket": 250000, "rate": 0.0575}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.02},
-                        {"bracket": 1000, "rate": 0.03},
-                        {"bracket": 2000, "rate": 0.04},
-                        {"bracket": 3000, "rate": 0.0475},
-                        {"bracket": 150000, "rate": 0.05},
-                        {"bracket": 175000, "rate": 0.0525},
-                        {"bracket": 225000, "rate": 0.055},
-                        {"bracket": 300000, "rate": 0.0575}
-                    ]
-                }
-            },
-            "MA": {
-                "2024": {
-                    "note": "Massachusetts has a flat tax rate",
-                    "single": [
-                        {"bracket": 0, "rate": 0.05}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.05}
-                    ]
-                }
-            },
-            "MI": {
-                "2024": {
-                    "note": "Michigan has a flat tax rate",
-                    "single": [
-                        {"bracket": 0, "rate": 0.0405}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0405}
-                    ]
-                }
-            },
-            "MN": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.0535},
-                        {"bracket": 31440, "rate": 0.068},
-                        {"bracket": 103600, "rate": 0.0785},
-                        {"bracket": 183560, "rate": 0.0985}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0535},
-                        {"bracket": 45760, "rate": 0.068},
-                        {"bracket": 180790, "rate": 0.0785},
-                        {"bracket": 283690, "rate": 0.0985}
-                    ]
-                }
-            },
-            "MS": {
-                "2024": {
-                    "note": "Mississippi has a flat tax rate",
-                    "single": [
-                        {"bracket": 0, "rate": 0.0495}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0495}
-                    ]
-                }
-            },
-            "MO": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.0},
-                        {"bracket": 1253, "rate": 0.015},
-                        {"bracket": 2506, "rate": 0.02},
-                        {"bracket": 3759, "rate": 0.025},
-                        {"bracket": 5012, "rate": 0.03},
-                        {"bracket": 6265, "rate": 0.035},
-                        {"bracket": 7518, "rate": 0.04},
-                        {"bracket": 8771, "rate": 0.045},
-                        {"bracket": 10024, "rate": 0.0495}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0},
-                        {"bracket": 1253, "rate": 0.015},
-                        {"bracket": 2506, "rate": 0.02},
-                        {"bracket": 3759, "rate": 0.025},
-                        {"bracket": 5012, "rate": 0.03},
-                        {"bracket": 6265, "rate": 0.035},
-                        {"bracket": 7518, "rate": 0.04},
-                        {"bracket": 8771, "rate": 0.045},
-                        {"bracket": 10024, "rate": 0.0495}
-                    ]
-                }
-            },
-            "MT": {
-                "2024": {
-                    "note": "Montana has a flat tax rate",
-                    "single": [
-                        {"bracket": 0, "rate": 0.0575}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0575}
-                    ]
-                }
-            },
-            "NE": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.0},
-                        {"bracket": 3700, "rate": 0.0351},
-                        {"bracket": 22170, "rate": 0.0451},
-                        {"bracket": 35730, "rate": 0.0582}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0},
-                        {"bracket": 7370, "rate": 0.0351},
-                        {"bracket": 44330, "rate": 0.0451},
-                        {"bracket": 71450, "rate": 0.0582}
-                    ]
-                }
-            },
-            "NV": {
-                "2024": {
-                    "note": "Nevada has no state income tax",
-                    "single": [
-                        {"bracket": 0, "rate": 0.0}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0}
-                    ]
-                }
-            },
-            "NH": {
-                "2024": {
-                    "note": "New Hampshire only taxes interest and dividend income at 4%",
-                    "single": [
-                        {"bracket": 0, "rate": 0.04}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.04}
-                    ]
-                }
-            },
-            "NJ": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.014},
-                        {"bracket": 20000, "rate": 0.0175},
-                        {"bracket": 35000, "rate": 0.035},
-                        {"bracket": 40000, "rate": 0.05525},
-                        {"bracket": 75000, "rate": 0.0637},
-                        {"bracket": 500000, "rate": 0.0897},
-                        {"bracket": 1000000, "rate": 0.1075}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.014},
-                        {"bracket": 20000, "rate": 0.0175},
-                        {"bracket": 50000, "rate": 0.035},
-                        {"bracket": 70000, "rate": 0.05525},
-                        {"bracket": 80000, "rate": 0.0637},
-                        {"bracket": 150000, "rate": 0.0897},
-                        {"bracket": 500000, "rate": 0.1075},
-                        {"bracket": 1000000, "rate": 0.1075}
-                    ]
-                }
-            },
-            "NM": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.019},
-                        {"bracket": 5500, "rate": 0.032},
-                        {"bracket": 11000, "rate": 0.047},
-                        {"bracket": 16000, "rate": 0.049},
-                        {"bracket": 210000, "rate": 0.059}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.019},
-                        {"bracket": 8000, "rate": 0.032},
-                        {"bracket": 16000, "rate": 0.047},
-                        {"bracket": 24000, "rate": 0.049},
-                        {"bracket": 315000, "rate": 0.059}
-                    ]
-                }
-            },
-            "NY": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.04},
-                        {"bracket": 13900, "rate": 0.045},
-                        {"bracket": 80650, "rate": 0.0525},
-                        {"bracket": 215400, "rate": 0.0585},
-                        {"bracket": 1077550, "rate": 0.0625},
-                        {"bracket": 5000000, "rate": 0.0685},
-                        {"bracket": 25000000, "rate": 0.103}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.04},
-                        {"bracket": 27900, "rate": 0.045},
-                        {"bracket": 161550, "rate": 0.0525},
-                        {"bracket": 323200, "rate": 0.0585},
-                        {"bracket": 2155350, "rate": 0.0625},
-                        {"bracket": 5000000, "rate": 0.0685},
-                        {"bracket": 25000000, "rate": 0.103}
-                    ]
-                }
-            },
-            "NC": {
-                "2024": {
-                    "note": "North Carolina has a flat tax rate",
-                    "single": [
-                        {"bracket": 0, "rate": 0.0475}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0475}
-                    ]
-                }
-            },
-            "ND": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.0},
-                        {"bracket": 1000, "rate": 0.011},
-                        {"bracket": 40525, "rate": 0.0204},
-                        {"bracket": 98100, "rate": 0.0227},
-                        {"bracket": 204675, "rate": 0.0264},
-                        {"bracket": 445000, "rate": 0.029}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0},
-                        {"bracket": 1000, "rate": 0.011},
-                        {"bracket": 67700, "rate": 0.0204},
-                        {"bracket": 163550, "rate": 0.0227},
-                        {"bracket": 249150, "rate": 0.0264},
-                        {"bracket": 445000, "rate": 0.029}
-                    ]
-                }
-            },
-            "OH": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.0},
-                        {"bracket": 26050, "rate": 0.02765},
-                        {"bracket": 46100, "rate": 0.03226},
-                        {"bracket": 92150, "rate": 0.03688},
-                        {"bracket": 115300, "rate": 0.03990}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0},
-                        {"bracket": 26050, "rate": 0.02765},
-                        {"bracket": 46100, "rate": 0.03226},
-                        {"bracket": 92150, "rate": 0.03688},
-                        {"bracket": 115300, "rate": 0.03990}
-                    ]
-                }
-            },
-            "OK": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.0025},
-                        {"bracket": 1000, "rate": 0.0075},
-                        {"bracket": 2500, "rate": 0.0175},
-                        {"bracket": 3750, "rate": 0.0275},
-                        {"bracket": 4900, "rate": 0.0375},
-                        {"bracket": 7200, "rate": 0.0475}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0025},
-                        {"bracket": 2000, "rate": 0.0075},
-                        {"bracket": 5000, "rate": 0.0175},
-                        {"bracket": 7500, "rate": 0.0275},
-                        {"bracket": 9800, "rate": 0.0375},
-                        {"bracket": 12200, "rate": 0.0475}
-                    ]
-                }
-            },
-            "OR": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.0475},
-                        {"bracket": 3750, "rate": 0.0675},
-                        {"bracket": 9450, "rate": 0.0875},
-                        {"bracket": 125000, "rate": 0.099}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0475},
-                        {"bracket": 7500, "rate": 0.0675},
-                        {"bracket": 18900, "rate": 0.0875},
-                        {"bracket": 250000, "rate": 0.099}
-                    ]
-                }
-            },
-            "PA": {
-                "2024": {
-                    "note": "Pennsylvania has a flat tax rate",
-                    "single": [
-                        {"bracket": 0, "rate": 0.0307}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0307}
-                    ]
-                }
-            },
-            "RI": {
-                "2024": {
-                    "single": [
-                        {"bracket": 0, "rate": 0.0375},
-                        {"bracket": 73450, "rate": 0.0475},
-                        {"bracket": 166950, "rate": 0.0599}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0375},
-                        {"bracket": 73450, "rate": 0.0475},
-                        {"bracket": 166950, "rate": 0.0599}
-                    ]
-                }
-            },
-            "SC": {
-                "2024": {
-                    "note": "South Carolina has a flat tax rate",
-                    "single": [
-                        {"bracket": 0, "rate": 0.0625}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0, "rate": 0.0625}
-                    ]
-                }
-            },
-            "SD": {
-                "2024": {
-                    "note": "South Dakota has no state income tax",
-                    "single": [
-                        {"bracket": 0, "rate": 0.0}
-                    ],
-                    "married_joint": [
-                        {"bracket": 0,
-        with open('data/state_tax_rates.json', 'w') as f:
-            json.dump(state_tax_data, f, indent=2)
+    # Copy the packaged seed data for any file that doesn't exist yet
+    for name in ('federal_tax_rates.json', 'state_tax_rates.json'):
+        seed_data_file(name, os.path.join('data', name))
     
     # Load tax data
     with open('data/federal_tax_rates.json', 'r') as f:
@@ -728,59 +28,157 @@ def load_tax_data():
     
     return federal_tax_rates, state_tax_rates
 
-# Load tax data at startup
-federal_tax_rates, state_tax_rates = load_tax_data()
+def arrange_tables(tax_data):
+    """load_tax_data()'s result nested like the shared representation, as stored"""
+    return arrange_bracket_layout(*tax_data)
+
+def compile_tables(tax_data, shared):
+    """Compile load_tax_data()'s result into the shared representation"""
+    return compile_bracket_layout(*tax_data, shared)
+
+# Largest number of records accepted by a single batch calculation request
+MAX_BATCH_SIZE = 100000
+
+# Records calculated together by the streaming endpoint; bounds its memory use
+STREAM_CHUNK_SIZE = 1000
+
+# Column order of streamed CSV input without a header row, and of CSV output
+CSV_FIELDS = ['income', 'year', 'filing_status', 'state']
+CSV_RESULT_FIELDS = ['state', 'income', 'year', 'filing_status', 'tax_amount', 'effective_rate', 'error']
+
+# Load tax data at startup; the store compiles it once and watches the files for changes
+DATA_SOURCE = 'tax_rate_api'
+store.register(DATA_SOURCE, load_tax_data, arrange_tables, compile_tables,
+               ['data/federal_tax_rates.json', 'data/state_tax_rates.json'])
+
+@app.before_request
+def start_data_watcher():
+    store.watcher.start()
+
+# Request counts, per-route latency and cache hit rates at /metrics
+metrics.install(app, DATA_SOURCE)
+
+# Admin-only cProfile of single requests (X-Profile header)
+install_profiler(app)
+
+def find_table(snapshot, state_code, year, filing_status):
+    """Look up compiled brackets, returning (table, error message)"""
+    if not state_code:
+        table = snapshot.find_table(FEDERAL, year, filing_status)
+        if table is not None:
+            return table, None
+        
+        if year not in snapshot.tables.get(FEDERAL, {}):
+            return None, f"Year {year} not found"
+        return None, f"Filing status {filing_status} not found"
+    
+    # The federal key is not a state
+    table = snapshot.find_table(state_code, year, filing_status) if state_code != FEDERAL else None
+    if table is not None:
+        return table, None
+    
+    if state_code not in snapshot.tables or state_code == FEDERAL:
+        return None, f"State {state_code} not found"
+    if year not in snapshot.tables[state_code]:
+        return None, f"Year {year} not found for state {state_code}"
+    return None, f"Filing status {filing_status} not found for state {state_code} in year {year}"
 
 @app.route('/')
 def home():
-    return jsonify({
+    snapshot = store.datasets[DATA_SOURCE]
+    return snapshot.responses.respond('home', lambda: home_payload(snapshot))
+
+def home_payload(snapshot):
+    return {
         "message": "Welcome to the Tax Rate API",
         "endpoints": {
             "Federal Tax Rates": "/api/federal/[year]/[filing_status]",
             "State Tax Rates": "/api/state/[state_code]/[year]/[filing_status]",
+            "Batch Tax Rates": "POST /api/rates/batch",
+            "Dataset Snapshot": "/api/snapshot?format=[json|bin]",
+            "Changes Since Version": "/api/changes?since=[version]",
             "Calculate Federal Tax": "/api/calculate/federal?income=[income]&year=[year]&filing_status=[filing_status]",
-            "Calculate State Tax": "/api/calculate/state?state=[state_code]&income=[income]&year=[year]&filing_status=[filing_status]"
+            "Calculate State Tax": "/api/calculate/state?state=[state_code]&income=[income]&year=[year]&filing_status=[filing_status]",
+            "Calculate Tax For All States": "/api/calculate/states?income=[income]&year=[year]&filing_status=[filing_status]&sort=[tax|-tax]",
+            "Calculate Total Tax": "/api/calculate/total?state=[state_code]&income=[income]&year=[year]&filing_status=[filing_status]",
+            "Marginal Rate": "/api/calculate/marginal?income=[income]&state=[state_code]&year=[year]&filing_status=[filing_status]",
+            "Calculate Gross Income": "/api/calculate/gross/[federal|state|total]?net=[net_income]&state=[state_code]&year=[year]&filing_status=[filing_status]",
+            "Batch Calculate": "POST /api/calculate/batch",
+            "Stream Calculate": "POST /api/calculate/stream?format=[ndjson|csv]"
         },
-        "available_years": list(federal_tax_rates.keys()),
-        "available_states": list(state_tax_rates.keys()),
+        "available_years": list(snapshot.tables.get(FEDERAL, {}).keys()),
+        "available_states": [state for state in snapshot.tables if state != FEDERAL],
         "available_filing_statuses": ["single", "married_joint", "head_of_household", "married_separate"]
-    })
+    }, 200
 
 @app.route('/api/federal/<year>/<filing_status>')
 def get_federal_rates(year, filing_status):
-    if year not in federal_tax_rates:
-        return jsonify({"error": f"Year {year} not found"}), 404
-    
-    if filing_status not in federal_tax_rates[year]:
-        return jsonify({"error": f"Filing status {filing_status} not found"}), 404
+    snapshot = store.datasets[DATA_SOURCE]
+    return snapshot.responses.respond((year, None, filing_status),
+                                      lambda: federal_rates_payload(snapshot, year, filing_status))
+
+def federal_rates_payload(snapshot, year, filing_status):
+    _, error = find_table(snapshot, None, year, filing_status)
+    if error:
+        return {"error": error}, 404
     
-    return jsonify({
+    return {
         "year": year,
         "filing_status": filing_status,
-        "tax_brackets": federal_tax_rates[year][filing_status]
-    })
+        "tax_brackets": snapshot.stored_brackets(FEDERAL, year, filing_status)
+    }, 200
 
 @app.route('/api/state/<state_code>/<year>/<filing_status>')
 def get_state_rates(state_code, year, filing_status):
     state_code = state_code.upper()
+    snapshot = store.datasets[DATA_SOURCE]
+    return snapshot.responses.respond((year, state_code, filing_status),
+                                      lambda: state_rates_payload(snapshot, state_code, year, filing_status))
+
+def state_rates_payload(snapshot, state_code, year, filing_status):
+    _, error = find_table(snapshot, state_code, year, filing_status)
+    if error:
+        return {"error": error}, 404
     
-    if state_code not in state_tax_rates:
-        return jsonify({"error": f"State {state_code} not found"}), 404
-    
-    if year not in state_tax_rates[state_code]:
-        return jsonify({"error": f"Year {year} not found for state {state_code}"}), 404
-    
-    if filing_status not in state_tax_rates[state_code][year]:
-        return jsonify({"error": f"Filing status {filing_status} not found for state {state_code} in year {year}"}), 404
-    
-    return jsonify({
+    return {
         "state": state_code,
         "year": year,
         "filing_status": filing_status,
-        "tax_brackets": state_tax_rates[state_code][year][filing_status]
-    })
+        "tax_brackets": snapshot.stored_brackets(state_code, year, filing_status)
+    }, 200
+
+@app.route('/api/rates/batch', methods=['POST'])
+def get_rates_batch():
+    data = request.get_json(silent=True)
+    
+    # Accept either a bare array or {"keys": [...]}
+    if isinstance(data, dict):
+        data = data.get('keys')
+    
+    if not isinstance(data, list):
+        return jsonify({"error": "Request body must be a JSON array of keys"}), 400
+    
+    if len(data) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"Batch size exceeds the limit of {MAX_BATCH_SIZE} keys"}), 413
+    
+    snapshot = store.datasets[DATA_SOURCE]
+    return snapshot.responses.respond_many(rates_request(snapshot, key) for key in data)
+
+def rates_request(snapshot, key):
+    """(cache key, build) for one key of a rates batch, shared with the single-key routes"""
+    if not isinstance(key, dict):
+        return None, lambda: ({"error": "Key must be a JSON object"}, 400)
+    
+    state_code = str(key.get('state') or '').upper()
+    year = str(key.get('year', '2024'))
+    filing_status = str(key.get('filing_status', 'single'))
+    
+    if not state_code:
+        return (year, None, filing_status), lambda: federal_rates_payload(snapshot, year, filing_status)
+    return (year, state_code, filing_status), lambda: state_rates_payload(snapshot, state_code, year, filing_status)
 
 @app.route('/api/calculate/federal')
+@cached_result(DATA_SOURCE, income=float, year=str, filing_status=str)
 def calculate_federal_tax():
     income = request.args.get('income', type=float)
     year = request.args.get('year', '2024')
@@ -789,24 +187,14 @@ def calculate_federal_tax():
     if not income:
         return jsonify({"error": "Income parameter is required"}), 400
     
-    if year not in federal_tax_rates:
-        return jsonify({"error": f"Year {year} not found"}), 404
-    
-    if filing_status not in federal_tax_rates[year]:
-        return jsonify({"error": f"Filing status {filing_status} not found"}), 404
+    table, error = find_table(store.datasets[DATA_SOURCE], None, year, filing_status)
+    if error:
+        return jsonify({"error": error}), 404
     
-    brackets = federal_tax_rates[year][filing_status]
-    tax = calculate_tax(income, brackets)
-    
-    return jsonify({
-        "income": income,
-        "year": year,
-        "filing_status": filing_status,
-        "tax_amount": tax,
-        "effective_rate": tax / income if income > 0 else 0
-    })
+    return jsonify(tax_result(None, income, year, filing_status, table.tax(income)))
 
 @app.route('/api/calculate/state')
+@cached_result(DATA_SOURCE, state=str.upper, income=float, year=str, filing_status=str)
 def calculate_state_tax():
     state_code = request.args.get('state', '').upper()
     income = request.args.get('income', type=float)
@@ -819,65 +207,414 @@ def calculate_state_tax():
     if not income:
         return jsonify({"error": "Income parameter is required"}), 400
     
-    if state_code not in state_tax_rates:
-        return jsonify({"error": f"State {state_code} not found"}), 404
+    table, error = find_table(store.datasets[DATA_SOURCE], state_code, year, filing_status)
+    if error:
+        return jsonify({"error": error}), 404
     
-    if year not in state_tax_rates[state_code]:
-        return jsonify({"error": f"Year {year} not found for state {state_code}"}), 404
+    return jsonify(tax_result(state_code, income, year, filing_status, table.tax(income)))
+
+@app.route('/api/calculate/states')
+@cached_result(DATA_SOURCE, income=float, year=str, filing_status=str, sort=str)
+def calculate_all_states_tax():
+    income = request.args.get('income', type=float)
+    year = request.args.get('year', '2024')
+    filing_status = request.args.get('filing_status', 'single')
+    sort = request.args.get('sort')
+    
+    if not income:
+        return jsonify({"error": "Income parameter is required"}), 400
     
-    if filing_status not in state_tax_rates[state_code][year]:
-        return jsonify({"error": f"Filing status {filing_status} not found for state {state_code} in year {year}"}), 404
+    if sort not in (None, 'tax', '-tax'):
+        return jsonify({"error": "Sort must be tax or -tax"}), 400
     
-    brackets = state_tax_rates[state_code][year][filing_status]
-    tax = calculate_tax(income, brackets)
+    tables = store.datasets[DATA_SOURCE].state_tables(year, filing_status)
+    if not tables:
+        return jsonify({"error": f"No state brackets found for year {year} and filing status {filing_status}"}), 404
+    
+    results = [tax_result(state_code, income, year, filing_status, table.tax(income))
+               for state_code, table in tables]
+    if sort:
+        results.sort(key=lambda result: result["tax_amount"], reverse=sort == '-tax')
+    
+    return jsonify({"results": results})
+
+@app.route('/api/calculate/total')
+@cached_result(DATA_SOURCE, state=str.upper, income=float, year=str, filing_status=str)
+def calculate_total_tax():
+    state_code = request.args.get('state', '').upper()
+    income = request.args.get('income', type=float)
+    year = request.args.get('year', '2024')
+    filing_status = request.args.get('filing_status', 'single')
+    
+    if not state_code:
+        return jsonify({"error": "State parameter is required"}), 400
+        
+    if not income:
+        return jsonify({"error": "Income parameter is required"}), 400
+    
+    snapshot = store.datasets[DATA_SOURCE]
+    
+    federal_table, error = find_table(snapshot, None, year, filing_status)
+    if error:
+        return jsonify({"error": error}), 404
+    
+    state_table, error = find_table(snapshot, state_code, year, filing_status)
+    if error:
+        return jsonify({"error": error}), 404
+    
+    federal_tax = federal_table.tax(income)
+    state_tax = state_table.tax(income)
+    tax = federal_tax + state_tax
     
     return jsonify({
         "state": state_code,
+        "income": income,
+        "year": year,
+        "filing_status": filing_status,
+        "federal_tax_amount": federal_tax,
+        "state_tax_amount": state_tax,
+        "tax_amount": tax,
+        "effective_rate": tax / income if income > 0 else 0,
+        "marginal_rate": federal_table.marginal_rate(income) + state_table.marginal_rate(income)
+    })
+
+@app.route('/api/calculate/gross/<any(federal, state, total):scope>')
+@cached_result(DATA_SOURCE, state=str.upper, net=float, year=str, filing_status=str)
+def calculate_gross_income(scope):
+    state_code = request.args.get('state', '').upper()
+    net = request.args.get('net', type=float)
+    year = request.args.get('year', '2024')
+    filing_status = request.args.get('filing_status', 'single')
+    
+    if scope != 'federal' and not state_code:
+        return jsonify({"error": "State parameter is required"}), 400
+    
+    if net is None:
+        return jsonify({"error": "Net parameter is required"}), 400
+    
+    if not net > 0:
+        return jsonify({"error": "Net parameter must be greater than 0"}), 400
+    
+    snapshot = store.datasets[DATA_SOURCE]
+    
+    tables = []
+    if scope != 'state':
+        table, error = find_table(snapshot, None, year, filing_status)
+        if error:
+            return jsonify({"error": error}), 404
+        tables.append(table)
+    if scope != 'federal':
+        table, error = find_table(snapshot, state_code, year, filing_status)
+        if error:
+            return jsonify({"error": error}), 404
+        tables.append(table)
+    
+    # Federal and state together are solved on their summed brackets
+    table = tables[0] if len(tables) == 1 else snapshot.combined_table(*tables)
+    income = table.income_for_net(net)
+    if income is None:
+        return jsonify({"error": f"No income leaves {net} after tax"}), 400
+    
+    if scope != 'total':
+        result = tax_result(state_code if scope == 'state' else None, income, year, filing_status, table.tax(income))
+    else:
+        federal_tax = tables[0].tax(income)
+        state_tax = tables[1].tax(income)
+        result = tax_result(state_code, income, year, filing_status, federal_tax + state_tax)
+        result.update({"federal_tax_amount": federal_tax, "state_tax_amount": state_tax})
+    
+    result["net_income"] = net
+    return jsonify(result)
+
+@app.route('/api/calculate/marginal')
+@cached_result(DATA_SOURCE, state=str.upper, income=float, year=str, filing_status=str)
+def calculate_marginal_rate():
+    state_code = request.args.get('state', '').upper()
+    income = request.args.get('income', type=float)
+    year = request.args.get('year', '2024')
+    filing_status = request.args.get('filing_status', 'single')
+    
+    if income is None:
+        return jsonify({"error": "Income parameter is required"}), 400
+    
+    table, error = find_table(store.datasets[DATA_SOURCE], state_code, year, filing_status)
+    if error:
+        return jsonify({"error": error}), 404
+    
+    lower, upper = table.bracket_bounds(income)
+    result = {"state": state_code} if state_code else {}
+    result.update({
+        "income": income,
+        "year": year,
+        "filing_status": filing_status,
+        "marginal_rate": table.marginal_rate(income),
+        "bracket_start": lower,
+        "bracket_end": upper,
+        "distance_to_next_bracket": upper - income if upper is not None else None,
+        "next_marginal_rate": table.marginal_rate(upper) if upper is not None else None
+    })
+    return jsonify(result)
+
+@app.route('/api/calculate/batch', methods=['POST'])
+@coalesced(DATA_SOURCE)
+def calculate_batch():
+    data = request.get_json(silent=True)
+    
+    # Accept either a bare array or {"records": [...]}
+    if isinstance(data, dict):
+        data = data.get('records')
+    
+    if not isinstance(data, list):
+        return jsonify({"error": "Request body must be a JSON array of records"}), 400
+    
+    if len(data) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"Batch size exceeds the limit of {MAX_BATCH_SIZE} records"}), 413
+    
+    return jsonify({"results": calculate_records(store.datasets[DATA_SOURCE], data)})
+
+@app.route('/api/calculate/stream', methods=['POST'])
+def calculate_stream():
+    fmt = request.args.get('format')
+    if fmt is None:
+        fmt = 'csv' if 'csv' in (request.mimetype or '') else 'ndjson'
+    if fmt not in ('ndjson', 'csv'):
+        return jsonify({"error": "Format must be ndjson or csv"}), 400
+    
+    # One snapshot for the whole stream, so every row uses the same data
+    snapshot = store.datasets[DATA_SOURCE]
+    # Invalid UTF-8 becomes U+FFFD, so the record gets an error row instead of ending the stream
+    lines = (line.decode('utf-8', errors='replace') for line in request.stream)
+    records = read_csv_records(lines) if fmt == 'csv' else read_ndjson_records(lines)
+    rows = stream_results(snapshot, records, fmt)
+    
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return app.response_class(stream_with_context(rows), mimetype=mimetype)
+
+def read_ndjson_records(lines):
+    """Yield one record per non-blank line of NDJSON"""
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            # calculate_records turns this into an error row
+            yield None
+
+def read_csv_records(lines):
+    """Yield records from CSV rows of income,year,filing_status,state.
+    
+    A first row starting with "income" is read as a header naming the
+    columns; empty cells fall back to the calculate defaults.
+    """
+    reader = csv.reader(lines)
+    fields = CSV_FIELDS
+    for row in reader:
+        if not row:
+            continue
+        if reader.line_num == 1 and row[0].strip().lower() == 'income':
+            fields = [field.strip().lower() for field in row]
+            continue
+        yield {field: value for field, value in zip(fields, row) if value != ''}
+
+def stream_results(snapshot, records, fmt):
+    """Calculate records in chunks, yielding encoded result rows as they are ready"""
+    if fmt == 'csv':
+        yield ','.join(CSV_RESULT_FIELDS) + '\r\n'
+    
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == STREAM_CHUNK_SIZE:
+            yield encode_results(calculate_records(snapshot, chunk), fmt)
+            chunk = []
+    if chunk:
+        yield encode_results(calculate_records(snapshot, chunk), fmt)
+
+def encode_results(results, fmt):
+    if fmt == 'ndjson':
+        return ''.join(json.dumps(result, separators=(',', ':')) + '\n' for result in results)
+    
+    out = io.StringIO()
+    writer = csv.DictWriter(out, CSV_RESULT_FIELDS)
+    writer.writerows(results)
+    return out.getvalue()
+
+def tax_result(state_code, income, year, filing_status, tax):
+    """Build the response body shared by the calculate endpoints"""
+    result = {}
+    if state_code:
+        result["state"] = state_code
+    result.update({
         "income": income,
         "year": year,
         "filing_status": filing_status,
         "tax_amount": tax,
         "effective_rate": tax / income if income > 0 else 0
     })
+    return result
+
+def calculate_records(snapshot, records):
+    """Calculate tax for a list of {income, year, filing_status, state} records.
+    
+    Records are grouped by bracket table so each table is looked up once
+    per batch; results come back in input order, with an error entry in
+    place of any record that cannot be calculated.
+    """
+    results = [None] * len(records)
+    groups = {}
+    
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            results[i] = {"error": "Record must be a JSON object"}
+            continue
+        
+        income = record.get('income')
+        try:
+            if isinstance(income, bool):
+                raise TypeError
+            income = float(income)
+        except (TypeError, ValueError):
+            income = None
+        if not income:
+            results[i] = {"error": "Income is required"}
+            continue
+        
+        state_code = str(record.get('state') or '').upper()
+        year = str(record.get('year', '2024'))
+        filing_status = str(record.get('filing_status', 'single'))
+        
+        key = (state_code, year, filing_status)
+        if key not in groups:
+            table, error = find_table(snapshot, state_code, year, filing_status)
+            groups[key] = (table, error, [], [])
+        table, error, indexes, incomes = groups[key]
+        
+        if error:
+            results[i] = {"error": error}
+            continue
+        indexes.append(i)
+        incomes.append(income)
+    
+    for (state_code, year, filing_status), (table, error, indexes, incomes) in groups.items():
+        if error:
+            continue
+        for i, income, tax in zip(indexes, incomes, table.tax_many(incomes)):
+            results[i] = tax_result(state_code, income, year, filing_status, tax)
+    
+    return results
 
 def calculate_tax(income, brackets):
     """Calculate tax based on marginal tax brackets"""
-    tax = 0
-    prev_bracket = 0
+    # Accept raw bracket lists as well as precompiled tables
+    if not isinstance(brackets, BracketTable):
+        brackets = BracketTable.from_brackets(brackets)
     
-    # Sort brackets by amount (ascending)
-    sorted_brackets = sorted(brackets, key=lambda x: x["bracket"])
+    # A sequence or array of incomes goes through the vectorized engine
+    if isinstance(income, (list, tuple)) or hasattr(income, '__array__'):
+        return brackets.tax_many(income)
     
-    for i, bracket in enumerate(sorted_brackets):
-        # If this is the last bracket or income falls within this bracket range
-        if i == len(sorted_brackets) - 1 or income <= sorted_brackets[i+1]["bracket"]:
-            tax += (income - prev_bracket) * bracket["rate"]
-            break
-        else:
-            # Calculate tax for this bracket range
-            tax += (sorted_brackets[i+1]["bracket"] - prev_bracket) * bracket["rate"]
-            prev_bracket = sorted_brackets[i+1]["bracket"]
-    
-    return tax
+    return brackets.tax(income)
 
 @app.route('/api/states')
 def get_states():
-    return jsonify({
-        "states": list(state_tax_rates.keys())
-    })
+    snapshot = store.datasets[DATA_SOURCE]
+    return snapshot.responses.respond('states', lambda: states_payload(snapshot))
+
+def states_payload(snapshot):
+    return {
+        "states": [state for state in snapshot.tables if state != FEDERAL]
+    }, 200
 
 @app.route('/api/years')
 def get_years():
-    federal_years = list(federal_tax_rates.keys())
+    snapshot = store.datasets[DATA_SOURCE]
+    return snapshot.responses.respond('years', lambda: years_payload(snapshot))
+
+def years_payload(snapshot):
+    federal_years = list(snapshot.tables.get(FEDERAL, {}).keys())
     
     state_years = {}
-    for state in state_tax_rates:
-        state_years[state] = list(state_tax_rates[state].keys())
+    for state in snapshot.tables:
+        if state != FEDERAL:
+            state_years[state] = list(snapshot.tables[state].keys())
     
-    return jsonify({
+    return {
         "federal_years": federal_years,
         "state_years": state_years
-    })
+    }, 200
+
+@app.route('/api/snapshot')
+def get_snapshot():
+    fmt = request.args.get('format', 'json')
+    if fmt not in ('json', 'bin'):
+        return jsonify({"error": "Format must be json or bin"}), 400
+    
+    # The current version's URL; its content never changes, so it can be cached forever
+    response = redirect(url_for('get_snapshot_version', version=store.datasets[DATA_SOURCE].version, fmt=fmt))
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/snapshot/<version>.<any(json, bin):fmt>')
+def get_snapshot_version(version, fmt):
+    snapshot = store.datasets[DATA_SOURCE]
+    if version != snapshot.version:
+        return jsonify({"error": f"Snapshot {version} is not the current version; fetch /api/snapshot"}), 404
+    
+    if fmt == 'json':
+        response = snapshot.responses.respond('snapshot', lambda: snapshot_payload(snapshot))
+    else:
+        response = app.response_class(snapshot.packed(), mimetype='application/octet-stream')
+        response.set_etag(f'{snapshot.version}-bin')
+        response = response.make_conditional(request)
+    
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+@app.route('/api/changes')
+def get_changes():
+    since = request.args.get('since')
+    if not since:
+        return jsonify({"error": "Since parameter is required"}), 400
+    
+    snapshot = store.datasets[DATA_SOURCE]
+    return snapshot.responses.respond(('changes', since), lambda: changes_payload(snapshot, since))
+
+def changes_payload(snapshot, since):
+    changed = snapshot.changes_since(since)
+    if changed is None:
+        return {
+            "error": f"Version {since} is not in the change log; resync from /api/snapshot",
+            "version": snapshot.version
+        }, 410
+    
+    changes = []
+    removed = []
+    for jurisdiction, year, filing_status in sorted(changed):
+        key = {"state": None if jurisdiction == FEDERAL else jurisdiction, "year": year, "filing_status": filing_status}
+        brackets = snapshot.stored_brackets(jurisdiction, year, filing_status)
+        if brackets is None:
+            removed.append(key)
+        else:
+            key["tax_brackets"] = brackets
+            changes.append(key)
+    
+    return {
+        "since": since,
+        "version": snapshot.version,
+        "changes": changes,
+        "removed": removed
+    }, 200
+
+def snapshot_payload(snapshot):
+    # The data as stored, in the same layout as the data files
+    state_tax_rates = dict(snapshot.stored)
+    federal_tax_rates = state_tax_rates.pop(FEDERAL, {})
+    return {
+        "version": snapshot.version,
+        "federal": federal_tax_rates,
+        "states": state_tax_rates
+    }, 200
 
 @app.route('/api/update/federal', methods=['POST'])
 def update_federal_rates():
@@ -888,12 +625,18 @@ def update_federal_rates():
     
     # Update federal tax rates
     try:
-        global federal_tax_rates
-        federal_tax_rates.update(data)
-        
-        # Save to file
-        with open('data/federal_tax_rates.json', 'w') as f:
-            json.dump(federal_tax_rates, f, indent=2)
+        with store.lock:
+            # Merge into the files as they are now, including other workers'
+            # changes; copy on write, so the published data is never mutated
+            federal_tax_rates, state_tax_rates = store.current_raw(DATA_SOURCE)
+            federal_tax_rates = dict(federal_tax_rates)
+            federal_tax_rates.update(data)
+            tax_data = (federal_tax_rates, state_tax_rates)
+            tables = store.compile(DATA_SOURCE, tax_data)
+            
+            # Save to file before publishing so a failed write changes nothing
+            write_json_atomic('data/federal_tax_rates.json', federal_tax_rates)
+            store.replace(DATA_SOURCE, tax_data, tables, ['data/federal_tax_rates.json'])
         
         return jsonify({"message": "Federal tax rates updated successfully"})
     except Exception as e:
@@ -908,12 +651,18 @@ def update_state_rates():
     
     # Update state tax rates
     try:
-        global state_tax_rates
-        state_tax_rates.update(data)
-        
-        # Save to file
-        with open('data/state_tax_rates.json', 'w') as f:
-            json.dump(state_tax_rates, f, indent=2)
+        with store.lock:
+            # Merge into the files as they are now, including other workers'
+            # changes; copy on write, so the published data is never mutated
+            federal_tax_rates, state_tax_rates = store.current_raw(DATA_SOURCE)
+            state_tax_rates = dict(state_tax_rates)
+            state_tax_rates.update(data)
+            tax_data = (federal_tax_rates, state_tax_rates)
+            tables = store.compile(DATA_SOURCE, tax_data)
+            
+            # Save to file before publishing so a failed write changes nothing
+            write_json_atomic('data/state_tax_rates.json', state_tax_rates)
+            store.replace(DATA_SOURCE, tax_data, tables, ['data/state_tax_rates.json'])
         
         return jsonify({"message": "State tax rates updated successfully"})
     except Exception as e:
@@ -0,0 +1,387 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import stat
+import tempfile
+import threading
+import time
+
+from tax_engine import FEDERAL, BracketTable, pack_tables
+from tax_http import ResponseCache, ResultCache
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of the data files; 0 disables hot reload
+RELOAD_INTERVAL = float(os.environ.get('TAX_DATA_RELOAD_INTERVAL', '2'))
+
+# Compact seed data shipped alongside the apps
+SEED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'seed')
+
+# Published versions whose changes are kept for delta sync
+CHANGE_LOG_SIZE = 1000
+
+
+def write_json_atomic(path, data):
+    """Write JSON to a temp file beside path, then rename it into place.
+
+    Readers of path (including other processes) see either the old file
+    or the complete new one, never a partially written file.
+    """
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # mkstemp creates the file owner-only; keep the permissions of the file being replaced
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(tmp_path, mode)
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def seed_data_file(name, path):
+    """Create path from the packaged seed file `name` if path doesn't exist yet.
+
+    The seed is only read on first run, so importing the apps never pays
+    for parsing it.
+    """
+    if os.path.exists(path):
+        return
+
+    with open(os.path.join(SEED_DIR, name), 'r') as f:
+        data = json.load(f)
+
+    # Keep data/ readable for hand edits; the atomic write also makes
+    # concurrent first starts safe
+    write_json_atomic(path, data)
+
+
+class DataWatcher:
+    """Poll data files and call reload() when any of them changes on disk.
+
+    A change is detected from each file's mtime, size and inode, so an
+    atomic rename by another process or worker is picked up even when the
+    mtime is unchanged. The polling thread is started lazily per process,
+    which keeps it working in workers forked after import.
+
+    Checks and reloads run under lock, so code that reads the loaded data
+    while holding it (e.g. to merge an update into it) can check() first
+    and be sure nothing changes underneath it.
+    """
+
+    def __init__(self, paths, reload, interval=RELOAD_INTERVAL, lock=None):
+        self.paths = list(paths)
+        self.reload = reload
+        self.interval = interval
+        self.lock = threading.RLock() if lock is None else lock
+        self.signature = self.current_signature()
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def add(self, paths):
+        """Watch more files, treating their current contents as already loaded"""
+        with self.lock:
+            self.paths.extend(paths)
+            self.mark_current(paths)
+
+    def current_signature(self, paths=None):
+        """{path: (mtime, size, inode) or None} of paths, by default every watched file"""
+        signature = {}
+        for path in self.paths if paths is None else paths:
+            try:
+                st = os.stat(path)
+                signature[path] = (st.st_mtime_ns, st.st_size, st.st_ino)
+            except FileNotFoundError:
+                signature[path] = None
+        return signature
+
+    def mark_current(self, paths=None):
+        """Record files as seen, e.g. right after this process wrote them.
+
+        Only paths are marked (every watched file by default), so changes
+        other processes made to the rest are still reloaded.
+        """
+        with self.lock:
+            signature = dict(self.signature)
+            signature.update(self.current_signature(paths))
+            self.signature = signature
+
+    def check(self):
+        """Reload if the files changed since the last check; returns True on reload"""
+        with self.lock:
+            signature = self.current_signature()
+            if signature == self.signature:
+                return False
+
+            # Recorded even if the reload fails, so a broken file is logged once
+            # and then skipped until it changes again
+            self.signature = signature
+            try:
+                self.reload()
+            except Exception:
+                # Keep serving the current data
+                logger.exception("Reloading tax data failed")
+                return False
+
+            return True
+
+    def start(self):
+        """Start the polling thread in this process if it is not already running.
+
+        The files are checked once right away, so a worker forked from a
+        preloaded master long after import doesn't serve the master's data
+        for a whole interval.
+        """
+        if self.interval <= 0 or self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self.check()
+            thread = threading.Thread(target=self._run, name='tax-data-watcher', daemon=True)
+            thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.check()
+
+
+def dataset_version(tables):
+    """Content hash identifying one version of the tax data (stored or compiled)"""
+    encoded = json.dumps(tables, sort_keys=True, separators=(',', ':'), default=BracketTable.key)
+    return hashlib.sha1(encoded.encode()).hexdigest()[:16]
+
+
+def same_entry(a, b):
+    """Whether two stored entries (bracket lists, tables or None) are the same"""
+    if isinstance(a, BracketTable) and isinstance(b, BracketTable):
+        return a is b or a.key() == b.key()
+    return a == b
+
+
+class TaxDataset:
+    """Immutable snapshot of the compiled tax data and everything derived from it.
+
+    New data is published by building a new snapshot and swapping it
+    into store.datasets, so a handler that reads its dataset once sees
+    consistent tables and cached responses for the whole request.
+
+    stored nests the brackets as the data files hold them (labels, order
+    and all) the same way as tables; it defaults to tables. Lookups serve
+    these, and the version covers them, so editing only a label is a new
+    version too.
+    """
+
+    def __init__(self, tables, previous=None, stored=None):
+        self.tables = tables
+        self.stored = tables if stored is None else stored
+        self.version = dataset_version(self.stored)
+
+        # Flat index so a calculation is one dict lookup away from its brackets
+        self.index = {
+            (jurisdiction, year, filing_status): table
+            for jurisdiction, years in tables.items()
+            for year, entry in years.items()
+            for filing_status, table in entry.items()
+            if isinstance(table, BracketTable)
+        }
+        self.stored_index = {
+            key: self.stored[key[0]][key[1]][key[2]]
+            for key in self.index
+        }
+
+        # Bracket lookup and metadata responses are encoded once per dataset version
+        self.responses = ResponseCache(self.version)
+
+        # Calculate responses for repeated inputs, dropped with this dataset
+        self.results = ResultCache()
+
+        # Summed tables (e.g. federal plus state), built on first use
+        self.combined = {}
+
+        # (year, filing status) -> every state's table, in data order; built
+        # up front so arbitrary requested keys never grow it
+        self.states_by_key = {}
+        for (jurisdiction, year, filing_status), table in self.index.items():
+            if jurisdiction != FEDERAL:
+                self.states_by_key.setdefault((year, filing_status), []).append((jurisdiction, table))
+
+        self._packed = None
+
+        # Monotonic publish count, plus (revision, version, changed keys) for
+        # each recent publish up to this one, oldest first
+        if previous is None:
+            self.revision = 0
+            self.history = ()
+        else:
+            self.revision = previous.revision + 1
+            changed = frozenset(key for key in self.index.keys() | previous.index.keys()
+                                if not same_entry(self.stored_index.get(key), previous.stored_index.get(key)))
+            self.history = previous.history[-(CHANGE_LOG_SIZE - 1):] + ((self.revision, self.version, changed),)
+
+    def find_table(self, jurisdiction, year, filing_status):
+        """Compiled brackets for a key, or None"""
+        return self.index.get((jurisdiction, year, filing_status))
+
+    def stored_brackets(self, jurisdiction, year, filing_status):
+        """Brackets for a key exactly as stored in the data files, or None"""
+        return self.stored_index.get((jurisdiction, year, filing_status))
+
+    def changes_since(self, version):
+        """Keys whose brackets changed after version was published, or None if it isn't in the log"""
+        for i in range(len(self.history) - 1, -1, -1):
+            if self.history[i][1] == version:
+                return frozenset().union(*(changed for _, _, changed in self.history[i + 1:]))
+        return None
+
+    def packed(self):
+        """The binary snapshot of this dataset (see tax_engine.pack_tables), built once"""
+        if self._packed is None:
+            self._packed = pack_tables(self.tables, self.version)
+        return self._packed
+
+    def state_tables(self, year, filing_status):
+        """[(state, table)] for every state with brackets for year and filing status"""
+        return self.states_by_key.get((year, filing_status), [])
+
+    def combined_table(self, *tables):
+        """BracketTable.combine(*tables), cached for the life of this dataset"""
+        table = self.combined.get(tables)
+        if table is None:
+            table = self.combined[tables] = BracketTable.combine(*tables)
+        return table
+
+
+# Previous dataset of a source's first publish
+EMPTY_DATASET = TaxDataset({})
+
+
+class DatasetStore:
+    """The process-wide current TaxDataset of every registered source.
+
+    Each app registers its own data files as a source and serves only that
+    source's dataset. When both apps are imported into one process they
+    share this store, so identical bracket sets are compiled once into the
+    same tables, and one watcher reloads every source's files.
+    """
+
+    def __init__(self):
+        self.loaders = {}
+        self.datasets = {}
+
+        # Each source's parsed files, kept so updates can write them back unchanged
+        self.raw = {}
+
+        # Identical bracket tables are shared across sources and updates
+        self.shared = {}
+
+        # Serializes writers; readers never take it
+        self.lock = threading.RLock()
+        self.watcher = DataWatcher([], self.reload, lock=self.lock)
+
+    def register(self, name, read, arrange, compile_tables, paths):
+        """Load a source and watch its files for changes.
+
+        read() returns the parsed files; arrange(raw) nests their brackets
+        as stored, and compile_tables(raw, shared) compiles them, the same
+        way as the tables (see tax_engine).
+        """
+        with self.lock:
+            self.loaders[name] = (read, arrange, compile_tables)
+            raw = read()
+            self._publish(name, raw, compile_tables(raw, self.shared))
+            self.watcher.add(paths)
+
+    def compile(self, name, raw):
+        """Compile parsed data for a source, e.g. to validate an update before writing it"""
+        return self.loaders[name][2](raw, self.shared)
+
+    def current_raw(self, name):
+        """A source's parsed files, first reloading any that other processes changed.
+
+        Call it holding lock, and merge an update into the result before
+        releasing it, so no other writer's change is lost.
+        """
+        with self.lock:
+            self.watcher.check()
+            return self.raw[name]
+
+    def replace(self, name, raw, tables, paths):
+        """Publish a source's new data after paths, its changed files, were written"""
+        with self.lock:
+            self.watcher.mark_current(paths)
+            self._publish(name, raw, tables)
+
+    def reload(self):
+        """Reload every source from disk, publishing only the ones that changed"""
+        with self.lock:
+            # Parse and compile everything first, so a bad file publishes nothing
+            loaded = {}
+            for name, (read, _, compile_tables) in self.loaders.items():
+                raw = read()
+                loaded[name] = (raw, compile_tables(raw, self.shared))
+            for name, (raw, tables) in loaded.items():
+                self._publish(name, raw, tables)
+
+    def _publish(self, name, raw, tables):
+        previous = self.datasets.get(name, EMPTY_DATASET)
+        dataset = TaxDataset(tables, previous, self.loaders[name][1](raw))
+        if name not in self.datasets or dataset.version != previous.version:
+            self.datasets[name] = dataset
+        self.raw[name] = raw
+
+        # Forget tables that no source uses any more
+        self.shared = {table.key(): table
+                       for dataset in self.datasets.values()
+                       for table in dataset.index.values()}
+
+
+# Shared by every app imported into this process
+store = DatasetStore()
+
+
+def cached_result(source, **params):
+    """Serve repeated requests to a calculate view from its source's result cache.
+
+    params maps each query parameter the view reads to the type it parses
+    it with, e.g. income=float; only those identify a cached result.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def cached_view(**kwargs):
+            return store.datasets[source].results.respond(lambda: view(**kwargs), params)
+
+        return cached_view
+
+    return decorator
+
+
+def coalesced(source):
+    """Share one response between concurrent identical requests to a view (e.g. a POSTed batch)"""
+
+    def decorator(view):
+        @functools.wraps(view)
+        def coalesced_view(**kwargs):
+            return store.datasets[source].results.coalesce(lambda: view(**kwargs))
+
+        return coalesced_view
+
+    return decorator
@@ -0,0 +1,84 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Tests reload changed files explicitly instead of through the polling thread
+os.environ['TAX_DATA_RELOAD_INTERVAL'] = '0'
+
+DATA_FILES = ['data/federal_tax_rates.json', 'data/state_tax_rates.json', 'data/tax_rates.json']
+
+
+@pytest.fixture(scope='session')
+def workdir(tmp_path_factory):
+    """Working directory for the session; the apps keep their data/ files in it"""
+    path = tmp_path_factory.mktemp('work')
+    cwd = os.getcwd()
+    os.chdir(path)
+    yield path
+    os.chdir(cwd)
+
+
+@pytest.fixture(scope='session')
+def app(workdir):
+    """app.py, serving both apps from the shared store"""
+    import app
+    return app
+
+
+@pytest.fixture(scope='session')
+def tax_rate_api(app):
+    return app.tax_rate_api
+
+
+@pytest.fixture(scope='session')
+def tax_api(app):
+    return app.tax_api
+
+
+@pytest.fixture(scope='session')
+def store(app):
+    import tax_store
+    return tax_store.store
+
+
+@pytest.fixture(scope='session')
+def tax_data(tax_rate_api):
+    """(federal, state) data as tax_rate_api.py loads it"""
+    return tax_rate_api.load_tax_data()
+
+
+@pytest.fixture(scope='session')
+def tax_rates(tax_api):
+    """Year -> jurisdiction data as tax-api.py loads it"""
+    return tax_api.load_tax_data()
+
+
+@pytest.fixture
+def restore_data(store):
+    """Undo any change a test makes to the data files, and reload them"""
+    files = {}
+    for path in DATA_FILES:
+        with open(path, 'r') as f:
+            files[path] = f.read()
+
+    yield
+
+    for path, content in files.items():
+        with open(path, 'w') as f:
+            f.write(content)
+    store.reload()
+    store.watcher.mark_current()
+
+
+@pytest.fixture
+def client(tax_rate_api):
+    return tax_rate_api.app.test_client()
+
+
+@pytest.fixture
+def tax_api_client(tax_api):
+    return tax_api.app.test_client()
@@ -0,0 +1,24 @@
+import pytest
+
+
+@pytest.fixture
+def app_client(app):
+    from werkzeug.test import Client
+    return Client(app.application)
+
+
+def test_routes_go_to_tax_rate_api(app_client):
+    response = app_client.get('/api/federal/2024/single')
+    assert response.status_code == 200
+    assert 'tax_brackets' in response.get_json()
+
+
+def test_other_routes_fall_through_to_tax_api(app_client):
+    response = app_client.get('/api/2024/WI/single')
+    assert response.status_code == 200
+    assert response.get_json()['state'] == 'WI'
+
+
+def test_unmatched_requests(app_client):
+    assert app_client.post('/api/federal/2024/single').status_code == 405
+    assert app_client.get('/no/such/route').status_code == 404
@@ -0,0 +1,41 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip('a2wsgi')
+
+
+def asgi_get(application, path, query_string=b''):
+    """Send one GET request through an ASGI app; returns (status, body)"""
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query_string,
+        'root_path': '', 'headers': [(b'host', b'testserver')],
+        'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+    }
+    asyncio.run(application(scope, receive, send))
+
+    status = next(message['status'] for message in sent if message['type'] == 'http.response.start')
+    body = b''.join(message.get('body', b'') for message in sent if message['type'] == 'http.response.body')
+    return status, body
+
+
+def test_asgi_serves_both_apps(app):
+    import asgi
+
+    status, body = asgi_get(asgi.application, '/api/calculate/federal', b'income=50000')
+    assert status == 200
+    assert json.loads(body)['tax_amount'] > 0
+
+    status, body = asgi_get(asgi.application, '/api/2024/WI/single')
+    assert status == 200
+    assert json.loads(body)['state'] == 'WI'
@@ -0,0 +1,40 @@
+import importlib.util
+import os
+
+import pytest
+
+from conftest import ROOT
+
+
+@pytest.fixture(scope='module')
+def bench():
+    spec = importlib.util.spec_from_file_location('bench', os.path.join(ROOT, 'benchmarks', 'bench.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_summarize(bench):
+    summary = bench.summarize([0.002, 0.004, 0.006, 0.008], ops_per_sample=2)
+    assert summary['ops_per_sec'] == pytest.approx(4 / 0.01)
+    assert summary['p50_us'] == pytest.approx(3000)
+    assert summary['mean_us'] == pytest.approx(2500)
+
+
+def test_compare_flags_regressions(bench):
+    baseline = {
+        "meta": {"python": "3", "created": "today"},
+        "results": {"fast": {"ops_per_sec": 100}, "slow": {"ops_per_sec": 100}},
+    }
+    results = {"fast": {"ops_per_sec": 90}, "slow": {"ops_per_sec": 70}, "new": {"ops_per_sec": 1}}
+    assert bench.compare(results, baseline, 0.2) == ['slow']
+
+
+def test_benchmarked_routes_succeed(bench, tax_rate_api, tax_api):
+    for name, module, method, url, body in bench.routes(tax_rate_api, tax_api):
+        response = bench.open_route(module.app.test_client(), method, url, body)
+        if url == '/api/snapshot':
+            assert response.status_code == 302, name
+        else:
+            assert response.status_code == 200, name
+            assert b'"error"' not in response.data, name
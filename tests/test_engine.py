@@ -0,0 +1,207 @@
+import pytest
+
+import tax_engine
+from tax_engine import (
+    FEDERAL, TOP_THRESHOLD, VECTORIZE_MIN, BracketTable, arrange_bracket_layout, arrange_threshold_layout,
+    bracket_layout, compile_bracket_layout, compile_threshold_layout, pack_tables, threshold_layout, unpack_tables,
+)
+
+
+def calculate_tax(income, brackets):
+    """The original bracket-walking calculation that BracketTable replaced"""
+    tax = 0
+    prev_bracket = 0
+
+    sorted_brackets = sorted(brackets, key=lambda x: x["bracket"])
+
+    for i, bracket in enumerate(sorted_brackets):
+        if i == len(sorted_brackets) - 1 or income <= sorted_brackets[i+1]["bracket"]:
+            tax += (income - prev_bracket) * bracket["rate"]
+            break
+        else:
+            tax += (sorted_brackets[i+1]["bracket"] - prev_bracket) * bracket["rate"]
+            prev_bracket = sorted_brackets[i+1]["bracket"]
+
+    return tax
+
+
+def bracket_lists(tax_data):
+    federal_tax_rates, state_tax_rates = tax_data
+    for years in [federal_tax_rates] + list(state_tax_rates.values()):
+        for statuses in years.values():
+            for brackets in statuses.values():
+                if isinstance(brackets, list) and brackets:
+                    yield brackets
+
+
+def incomes_around(brackets):
+    incomes = [0.01, 1, 999.99, 50000, 75000.25, 1e6, 1e9]
+    for bracket in brackets:
+        incomes += [bracket["bracket"] - 0.01, bracket["bracket"], bracket["bracket"] + 0.01]
+    return [income for income in incomes if income > 0]
+
+
+def test_tax_matches_original_calculation(tax_data):
+    for brackets in bracket_lists(tax_data):
+        table = BracketTable.from_brackets(brackets)
+        for income in incomes_around(brackets):
+            assert table.tax(income) == pytest.approx(calculate_tax(income, brackets), rel=1e-12, abs=1e-9)
+
+
+def test_unsorted_brackets_match_original_calculation():
+    brackets = [{"bracket": 40000, "rate": 0.2}, {"bracket": 500, "rate": 0.05}, {"bracket": 10000, "rate": 0.1}]
+    table = BracketTable.from_brackets(brackets)
+    for income in [100, 500, 9999.5, 10000, 25000, 40000, 90000]:
+        assert table.tax(income) == pytest.approx(calculate_tax(income, brackets))
+
+
+def test_empty_table():
+    assert BracketTable.from_brackets([]).tax(50000) == 0
+
+
+def test_tax_many_matches_original_calculation(tax_data):
+    brackets = tax_data[0]['2024']['single']
+    table = BracketTable.from_brackets(brackets)
+
+    # Long enough to take the vectorized path when NumPy is installed
+    incomes = incomes_around(brackets) * VECTORIZE_MIN
+    expected = [calculate_tax(income, brackets) for income in incomes]
+    assert table.tax_many(incomes) == pytest.approx(expected, rel=1e-12, abs=1e-9)
+    assert table.tax_many(incomes[:3]) == pytest.approx(expected[:3], rel=1e-12, abs=1e-9)
+
+
+def test_tax_many_without_numpy(tax_data, monkeypatch):
+    brackets = tax_data[0]['2024']['single']
+    incomes = incomes_around(brackets) * VECTORIZE_MIN
+    monkeypatch.setattr(tax_engine, 'load_numpy', lambda: None)
+
+    expected = [calculate_tax(income, brackets) for income in incomes]
+    assert BracketTable.from_brackets(brackets).tax_many(incomes) == pytest.approx(expected, rel=1e-12, abs=1e-9)
+
+
+def test_tax_array_boundaries_match_tax():
+    pytest.importorskip('numpy')
+    table = BracketTable.from_brackets([{"bracket": 0, "rate": 0.1}, {"bracket": 1000, "rate": 0.2}])
+    incomes = [999.99, 1000, 1000.01, 5000]
+
+    assert table.tax_array(incomes).tolist() == pytest.approx([table.tax(income) for income in incomes])
+    assert BracketTable.from_brackets([]).tax_many([1, 2]) == [0, 0]
+
+
+def test_from_thresholds_matches_equivalent_brackets():
+    thresholds = [{"threshold": 10000, "rate": 0.1}, {"threshold": 999999999, "rate": 0.2}]
+    brackets = [{"bracket": 0, "rate": 0.1}, {"bracket": 10000, "rate": 0.2}]
+
+    table = BracketTable.from_thresholds(thresholds)
+    assert table.key() == BracketTable.from_brackets(brackets).key()
+    assert table.to_brackets() == brackets
+    assert table.to_thresholds() == thresholds
+
+
+
+def test_thresholds_match_equivalent_brackets_in_data(tax_rates):
+    for jurisdictions in tax_rates.values():
+        for statuses in jurisdictions.values():
+            for thresholds in statuses.values():
+                if not isinstance(thresholds, list) or not thresholds:
+                    continue
+                ordered = sorted(thresholds, key=lambda x: x["threshold"])
+                brackets = [{"bracket": 0, "rate": ordered[0]["rate"]}]
+                brackets += [{"bracket": lower["threshold"], "rate": upper["rate"]}
+                             for lower, upper in zip(ordered, ordered[1:])]
+
+                table = BracketTable.from_thresholds(thresholds)
+                for income in incomes_around(brackets):
+                    assert table.tax(income) == pytest.approx(calculate_tax(income, brackets), rel=1e-12, abs=1e-9)
+
+
+def test_thresholds_round_trip():
+    thresholds = [{"threshold": 10000, "rate": 0.02}, {"threshold": TOP_THRESHOLD, "rate": 0.05}]
+    assert BracketTable.from_thresholds(thresholds).to_thresholds() == thresholds
+
+    # An explicit top bound other than the sentinel is kept
+    thresholds = [{"threshold": 10000, "rate": 0.02}, {"threshold": 50000.5, "rate": 0.05}]
+    assert BracketTable.from_thresholds(thresholds).to_thresholds() == thresholds
+
+
+def test_arrange_nests_stored_data_like_the_tables(tax_data, tax_rates):
+    federal_tax_rates, state_tax_rates = tax_data
+    stored = arrange_bracket_layout(federal_tax_rates, state_tax_rates)
+    assert stored[FEDERAL] is federal_tax_rates
+    assert stored['CA'] is state_tax_rates['CA']
+
+    stored = arrange_threshold_layout(tax_rates)
+    assert stored['WI']['2024'] is tax_rates['2024']['WI']
+    assert stored.keys() == compile_threshold_layout(tax_rates).keys()
+
+def test_bracket_layout_round_trip(tax_data):
+    federal_tax_rates, state_tax_rates = tax_data
+    tables = compile_bracket_layout(federal_tax_rates, state_tax_rates)
+    assert bracket_layout(tables) == (federal_tax_rates, state_tax_rates)
+
+
+def test_threshold_layout_round_trip(tax_rates):
+    assert threshold_layout(compile_threshold_layout(tax_rates)) == tax_rates
+
+
+def test_identical_tables_are_shared(tax_rates):
+    shared = {}
+    tables = compile_threshold_layout(tax_rates, shared)
+    again = compile_threshold_layout(tax_rates, shared)
+
+    assert again['US']['2024']['single'] is tables['US']['2024']['single']
+    assert len(shared) < sum(len(entry) for years in tables.values() for entry in years.values())
+
+
+def test_tables_use_compact_buffers():
+    table = BracketTable.from_brackets([{"bracket": 0, "rate": 0.1}, {"bracket": 10000.5, "rate": 0.2}])
+
+    assert all(values.typecode == 'd' for values in (table.starts, table.rates, table.base))
+    # Integral bounds come back as JSON ints, fractional ones as floats
+    assert table.to_brackets() == [{"bracket": 0, "rate": 0.1}, {"bracket": 10000.5, "rate": 0.2}]
+    assert isinstance(table.to_brackets()[0]["bracket"], int)
+
+
+def test_income_for_net_inverts_tax(tax_data):
+    brackets = tax_data[0]['2024']['single']
+    table = BracketTable.from_brackets(brackets)
+    for income in incomes_around(brackets):
+        assert table.income_for_net(income - table.tax(income)) == pytest.approx(income, rel=1e-12, abs=1e-6)
+
+    assert BracketTable.from_brackets([]).income_for_net(500) == 500
+    assert BracketTable.from_brackets([{"bracket": 0, "rate": 1.0}]).income_for_net(500) is None
+
+
+def test_combine_sums_rates():
+    federal = BracketTable.from_brackets([{"bracket": 0, "rate": 0.1}, {"bracket": 10000, "rate": 0.2}])
+    state = BracketTable.from_brackets([{"bracket": 0, "rate": 0.01}, {"bracket": 5000, "rate": 0.05}])
+    combined = BracketTable.combine(federal, state)
+
+    for income in [100, 5000, 7500, 10000, 50000]:
+        assert combined.tax(income) == pytest.approx(federal.tax(income) + state.tax(income))
+
+
+def test_bracket_bounds():
+    table = BracketTable.from_brackets([{"bracket": 0, "rate": 0.1}, {"bracket": 10000, "rate": 0.2}])
+
+    assert table.bracket_bounds(5000) == (0, 10000)
+    # An income on a boundary is taxed at the next bracket's rate for its next dollar
+    assert table.bracket_bounds(10000) == (10000, None)
+    assert table.marginal_rate(10000) == 0.2
+    assert BracketTable.from_brackets([]).bracket_bounds(5000) == (0, None)
+
+
+def test_pack_round_trip(tax_rates):
+    tables = compile_threshold_layout(tax_rates, {})
+    data = pack_tables(tables, 'v1')
+    version, unpacked = unpack_tables(data)
+
+    assert version == 'v1'
+    assert threshold_layout(unpacked) == threshold_layout(tables)
+    # Shared tables are stored once and stay shared
+    assert unpacked['TX']['2024']['single'] is unpacked['TX']['2024']['married_joint']
+
+
+def test_unpack_rejects_other_data():
+    with pytest.raises(ValueError):
+        unpack_tables(b'{"version": "v1"}')
@@ -0,0 +1,160 @@
+import gzip
+import threading
+import time
+
+import pytest
+from flask import Flask, jsonify
+
+from tax_http import Metrics, ResponseCache, ResultCache, SingleFlight
+
+
+def test_metrics_render():
+    metrics = Metrics()
+    metrics.observe(('api', 'calculate', 'GET'), 200, 0.0003)
+    metrics.observe(('api', 'calculate', 'GET'), 404, 2.0)
+    metrics.count_cache('responses', True)
+    metrics.count_cache('responses', False)
+    metrics.count_cache('responses', False)
+
+    lines = metrics.render().splitlines()
+    assert 'tax_api_requests_total{app="api",route="calculate",method="GET",status="200"} 1' in lines
+    assert 'tax_api_request_errors_total{app="api",route="calculate",status="404"} 1' in lines
+    assert 'tax_api_request_duration_seconds_bucket{app="api",route="calculate",le="0.00025"} 0' in lines
+    assert 'tax_api_request_duration_seconds_bucket{app="api",route="calculate",le="0.0005"} 1' in lines
+    assert 'tax_api_request_duration_seconds_bucket{app="api",route="calculate",le="+Inf"} 2' in lines
+    assert 'tax_api_request_duration_seconds_count{app="api",route="calculate"} 2' in lines
+    assert 'tax_api_cache_requests_total{cache="responses",result="miss"} 2' in lines
+
+
+@pytest.fixture
+def cache_app():
+    return Flask('cache_test')
+
+
+# The query parameters a calculate view reads, with their types
+PARAMS = {"income": float, "state": str.upper}
+
+
+def cached_call(app, cache, path, build):
+    with app.test_request_context(path):
+        return cache.respond(build, PARAMS)
+
+
+def jsonify_body(app, payload):
+    with app.app_context():
+        return jsonify(payload).get_data()
+
+
+def test_result_cache_serves_repeats(cache_app):
+    cache = ResultCache(max_bytes=10000)
+    calls = []
+
+    def build():
+        calls.append(1)
+        return jsonify({"n": len(calls)})
+
+    first = cached_call(cache_app, cache, '/calc?income=1&state=CA', build)
+    again = cached_call(cache_app, cache, '/calc?state=ca&income=1.0&pad=xxxx', build)
+    assert again.get_json() == first.get_json() == {"n": 1}
+    assert again.mimetype == 'application/json'
+
+    cached_call(cache_app, cache, '/calc?income=2&state=CA', build)
+    assert len(calls) == 2
+
+
+def test_result_cache_skips_errors(cache_app):
+    cache = ResultCache(max_bytes=10000)
+    cached_call(cache_app, cache, '/calc', lambda: (jsonify({"error": "no"}), 400))
+    assert not cache.entries
+
+
+def test_result_cache_evicts_least_recently_used(cache_app):
+    body = {"pad": "x" * 100}
+    # Body, allowance, and the app name and path in the key
+    entry_size = len(jsonify_body(cache_app, body)) + ResultCache.ENTRY_OVERHEAD + len('cache_test/a')
+    cache = ResultCache(max_bytes=2 * entry_size)
+
+    for path in ['/a', '/b', '/a', '/c']:
+        cached_call(cache_app, cache, path, lambda: jsonify(body))
+
+    assert [key[1] for key in cache.entries] == ['/a', '/c']
+    assert cache.size == 2 * entry_size
+
+
+def test_result_cache_ttl(cache_app, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    cache = ResultCache(max_bytes=10000, ttl=5)
+    calls = []
+
+    def build():
+        calls.append(1)
+        return jsonify({"n": len(calls)})
+
+    cached_call(cache_app, cache, '/calc', build)
+    now[0] += 4
+    assert cached_call(cache_app, cache, '/calc', build).get_json() == {"n": 1}
+    now[0] += 2
+    assert cached_call(cache_app, cache, '/calc', build).get_json() == {"n": 2}
+
+
+def test_result_cache_disabled(cache_app):
+    cache = ResultCache(max_bytes=0)
+    cached_call(cache_app, cache, '/calc', lambda: jsonify({}))
+    assert not cache.entries
+
+
+def test_single_flight_shares_concurrent_calls():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'result'
+
+    leader = threading.Thread(target=lambda: results.append(flights.do('key', slow)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flights.do('key', slow))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    # Give the followers time to start waiting on the leader
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(results) == [('result', False)] + [('result', True)] * 3
+    assert not flights.calls
+
+    # Once finished, the next call runs again
+    assert flights.do('key', lambda: 'again') == ('again', False)
+
+
+def test_single_flight_shares_exceptions():
+    flights = SingleFlight()
+
+    def fail():
+        raise ValueError('bad')
+
+    with pytest.raises(ValueError):
+        flights.do('key', fail)
+    assert not flights.calls
+
+
+def test_compressed_body_is_built_once():
+    cache = ResponseCache('v1')
+    body = b'{"brackets": [' + b'0.1, ' * 100 + b'0.2]}'
+
+    encoded = cache.compressed_body('key', body, 'gzip')
+    assert gzip.decompress(encoded) == body
+    assert cache.compressed_body('key', body, 'gzip') is encoded
+
+    # Too small to be worth compressing
+    assert cache.compressed_body('small', b'{}', 'gzip') is None
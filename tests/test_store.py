@@ -0,0 +1,184 @@
+import json
+import os
+
+import pytest
+
+from tax_engine import FEDERAL, BracketTable
+from tax_store import SEED_DIR, DataWatcher, TaxDataset, seed_data_file, write_json_atomic
+
+
+def test_write_json_atomic(tmp_path):
+    path = tmp_path / 'rates.json'
+    path.write_text('{}')
+    os.chmod(path, 0o640)
+
+    write_json_atomic(str(path), {"2024": {"single": []}})
+    assert json.loads(path.read_text()) == {"2024": {"single": []}}
+    assert os.stat(path).st_mode & 0o777 == 0o640
+    assert os.listdir(tmp_path) == ['rates.json']
+
+
+def test_write_json_atomic_failure_keeps_old_file(tmp_path):
+    path = tmp_path / 'rates.json'
+    path.write_text('{"old": true}')
+
+    with pytest.raises(TypeError):
+        write_json_atomic(str(path), {"bad": object()})
+    assert json.loads(path.read_text()) == {"old": True}
+    assert os.listdir(tmp_path) == ['rates.json']
+
+
+def test_data_watcher(tmp_path):
+    path = str(tmp_path / 'rates.json')
+    write_json_atomic(path, {"rate": 1})
+    loaded = []
+
+    def reload():
+        with open(path, 'r') as f:
+            loaded.append(json.load(f))
+
+    watcher = DataWatcher([path], reload, interval=0)
+    assert not watcher.check()
+
+    write_json_atomic(path, {"rate": 2})
+    assert watcher.check()
+    assert loaded == [{"rate": 2}]
+    assert not watcher.check()
+
+    # Files this process wrote itself are marked as seen
+    write_json_atomic(path, {"rate": 3})
+    watcher.mark_current()
+    assert not watcher.check()
+    assert len(loaded) == 1
+
+
+def test_data_watcher_keeps_data_when_reload_fails(tmp_path):
+    path = tmp_path / 'rates.json'
+    path.write_text('{"rate": 1}')
+    loaded = []
+
+    def reload():
+        loaded.append(json.loads(path.read_text()))
+
+    watcher = DataWatcher([str(path)], reload, interval=0)
+    path.write_text('{"rate": ')
+    assert not watcher.check()
+    assert loaded == []
+
+    # A broken file is tried once, then skipped until it changes
+    attempts = []
+    watcher.reload = lambda: attempts.append(1)
+    assert not watcher.check()
+    assert attempts == []
+    watcher.reload = reload
+
+    path.write_text('{"rate": 2}')
+    assert watcher.check()
+    assert loaded == [{"rate": 2}]
+
+
+
+def test_data_watcher_checks_when_started(tmp_path):
+    path = tmp_path / 'rates.json'
+    path.write_text('{"rate": 1}')
+    loaded = []
+
+    watcher = DataWatcher([str(path)], lambda: loaded.append(json.loads(path.read_text())), interval=3600)
+    write_json_atomic(str(path), {"rate": 2})
+    watcher.start()
+    assert loaded == [{"rate": 2}]
+
+    # Already running in this process
+    watcher.start()
+    assert len(loaded) == 1
+
+def test_seed_data_file(tmp_path):
+    path = tmp_path / 'tax_rates.json'
+    seed_data_file('tax_rates.json', str(path))
+
+    with open(os.path.join(SEED_DIR, 'tax_rates.json'), 'r') as f:
+        assert json.loads(path.read_text()) == json.load(f)
+
+    # Existing data files are never replaced
+    path.write_text('{}')
+    seed_data_file('tax_rates.json', str(path))
+    assert path.read_text() == '{}'
+
+
+def flat(rate):
+    return BracketTable.from_brackets([{"bracket": 0, "rate": rate}])
+
+
+def dataset_tables(**states):
+    tables = {FEDERAL: {'2024': {'single': flat(0.1)}}}
+    for state, rate in states.items():
+        tables[state] = {'2024': {'single': flat(rate)}}
+    return tables
+
+
+def publish(tables, previous=None):
+    """A dataset published after previous, or as a store's first publish"""
+    return TaxDataset(tables, TaxDataset({}) if previous is None else previous)
+
+
+def test_changes_since_lists_changed_keys():
+    first = publish(dataset_tables(AA=0.01, BB=0.02))
+    second = publish(dataset_tables(AA=0.01, BB=0.03), first)
+    third = publish(dataset_tables(AA=0.01, CC=0.04), second)
+
+    assert second.changes_since(first.version) == {('BB', '2024', 'single')}
+    assert third.changes_since(second.version) == {('BB', '2024', 'single'), ('CC', '2024', 'single')}
+    assert third.changes_since(first.version) == {('BB', '2024', 'single'), ('CC', '2024', 'single')}
+    assert third.changes_since(third.version) == frozenset()
+
+
+def test_changes_since_unknown_version():
+    first = publish(dataset_tables(AA=0.01))
+    second = publish(dataset_tables(AA=0.02), first)
+
+    assert second.changes_since('not-a-version') is None
+    assert first.changes_since(first.version) == frozenset()
+
+
+def test_changes_since_returns_to_earlier_data():
+    first = publish(dataset_tables(AA=0.01))
+    second = publish(dataset_tables(AA=0.02), first)
+    third = publish(dataset_tables(AA=0.01), second)
+
+    # The latest publish of a version counts, so the change back is listed
+    assert third.version == first.version
+    assert third.changes_since(second.version) == {('AA', '2024', 'single')}
+    assert third.changes_since(third.version) == frozenset()
+    assert third.revision == first.revision + 2
+
+
+def test_sources_share_identical_tables(store):
+    tax_rate_api = store.datasets['tax_rate_api']
+    tax_api = store.datasets['tax-api']
+
+    # Both files hold the same 2024 federal brackets
+    assert tax_rate_api.find_table(FEDERAL, '2024', 'single') is tax_api.find_table(FEDERAL, '2024', 'single')
+
+
+def test_state_tables():
+    dataset = TaxDataset(dataset_tables(AA=0.01, BB=0.02))
+
+    assert [state for state, _ in dataset.state_tables('2024', 'single')] == ['AA', 'BB']
+    assert dataset.state_tables('1999', 'single') == []
+    assert ('1999', 'single') not in dataset.states_by_key
+
+
+def test_data_watcher_marks_only_given_paths(tmp_path):
+    paths = [str(tmp_path / 'a.json'), str(tmp_path / 'b.json')]
+    for path in paths:
+        write_json_atomic(path, {})
+    loaded = []
+
+    watcher = DataWatcher(paths, lambda: loaded.append(1), interval=0)
+    write_json_atomic(paths[0], {"rate": 1})
+    write_json_atomic(paths[1], {"rate": 2})
+
+    # Writing a, this process marks only a; b's change still triggers a reload
+    watcher.mark_current([paths[0]])
+    assert watcher.check()
+    assert loaded == [1]
@@ -0,0 +1,83 @@
+import json
+
+from tax_store import write_json_atomic
+
+
+def stored_rates():
+    with open('data/tax_rates.json', 'r') as f:
+        return json.load(f)
+
+
+def test_rates_return_stored_brackets(tax_api_client):
+    body = tax_api_client.get('/api/2024/wi/single').get_json()
+
+    assert body['state'] == 'WI'
+    assert body['tax_brackets'] == stored_rates()['2024']['WI']['single']
+
+
+
+def test_rates_come_from_tax_api_data_only(tax_api_client, client):
+    # CA is in both apps' files; each app serves its own brackets for it
+    for filing_status, brackets in stored_rates()['2024']['CA'].items():
+        body = tax_api_client.get(f'/api/2024/CA/{filing_status}').get_json()
+        assert body['tax_brackets'] == brackets
+
+    assert client.get('/api/state/WI/2024/single').status_code == 404
+
+def test_rates_are_conditional(tax_api_client):
+    response = tax_api_client.get('/api/2024/US/married_joint')
+    again = tax_api_client.get('/api/2024/US/married_joint', headers={'If-None-Match': response.headers['ETag']})
+    assert again.status_code == 304
+
+
+def test_rates_errors(tax_api_client):
+    response = tax_api_client.get('/api/2024/ZZ/single')
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
+
+
+
+def test_rates_batch_matches_lookups(tax_api_client):
+    keys = [{"state": "wi", "year": 2024}, {"state": "US", "filing_status": "married_joint"}, {"state": "ZZ"}, {}]
+    results = tax_api_client.post('/api/rates', json=keys).get_json()['results']
+
+    assert results[0] == tax_api_client.get('/api/2024/WI/single').get_json()
+    assert results[1] == tax_api_client.get('/api/2024/US/married_joint').get_json()
+    assert 'error' in results[2] and 'error' in results[3]
+
+
+def test_rates_batch_rejects_bad_bodies(tax_api, tax_api_client, monkeypatch):
+    assert tax_api_client.post('/api/rates', data='[').status_code == 400
+
+    monkeypatch.setattr(tax_api, 'MAX_BATCH_SIZE', 1)
+    assert tax_api_client.post('/api/rates', json={"keys": [{}, {}]}).status_code == 413
+
+def test_metadata(tax_api_client):
+    rates = stored_rates()
+
+    assert tax_api_client.get('/api/2024/states').get_json() == {"states": list(rates['2024'])}
+    assert tax_api_client.get('/api/years').get_json()['federal_years'] == list(rates)
+    assert tax_api_client.get('/api/1999/states').status_code == 404
+
+    etag = tax_api_client.get('/').headers['ETag']
+    assert tax_api_client.get('/', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_reloads_file_changed_elsewhere(store, tax_api_client, restore_data):
+    rates = stored_rates()
+    rates['2024']['WI']['single'] = [{"threshold": 999999999, "rate": 0.5}]
+    write_json_atomic('data/tax_rates.json', rates)
+
+    assert store.watcher.check()
+    assert tax_api_client.get('/api/2024/WI/single').get_json()['tax_brackets'] == rates['2024']['WI']['single']
+
+
+def test_rates_return_thresholds_as_stored(store, tax_api_client, restore_data):
+    rates = stored_rates()
+    rates['2024']['WI']['single'] = [{"threshold": 999999999, "rate": 0.07, "label": "top"},
+                                     {"threshold": 15000, "rate": 0.03, "label": "first"}]
+    write_json_atomic('data/tax_rates.json', rates)
+    store.watcher.check()
+
+    body = tax_api_client.get('/api/2024/WI/single').get_json()
+    assert body['tax_brackets'] == rates['2024']['WI']['single']
@@ -0,0 +1,687 @@
+import gzip
+import json
+import os
+import pstats
+import threading
+import time
+
+import pytest
+
+import tax_http
+from tax_engine import FEDERAL, unpack_tables
+from tax_store import dataset_version, write_json_atomic
+from test_engine import calculate_tax
+
+
+def current(store):
+    """tax_rate_api.py's current dataset"""
+    return store.datasets['tax_rate_api']
+
+
+def test_calculate_federal(client, tax_data):
+    brackets = tax_data[0]['2024']['married_joint']
+    body = client.get('/api/calculate/federal?income=85000&filing_status=married_joint').get_json()
+
+    assert body['tax_amount'] == pytest.approx(calculate_tax(85000, brackets))
+    assert body['effective_rate'] == pytest.approx(body['tax_amount'] / 85000)
+
+
+def test_calculate_state(client, tax_data):
+    brackets = tax_data[1]['CA']['2024']['single']
+    body = client.get('/api/calculate/state?state=ca&income=60000').get_json()
+
+    assert body['state'] == 'CA'
+    assert body['tax_amount'] == pytest.approx(calculate_tax(60000, brackets))
+
+
+@pytest.mark.parametrize('url, status', [
+    ('/api/calculate/federal', 400),
+    ('/api/calculate/federal?income=50000&year=1999', 404),
+    ('/api/calculate/state?income=50000', 400),
+    ('/api/calculate/state?state=ZZ&income=50000', 404),
+])
+def test_calculate_errors(client, url, status):
+    response = client.get(url)
+    assert response.status_code == status
+    assert 'error' in response.get_json()
+
+
+def test_calculate_tax_accepts_raw_brackets(tax_rate_api):
+    brackets = [{"bracket": 10000, "rate": 0.2}, {"bracket": 0, "rate": 0.1}]
+    table = tax_rate_api.BracketTable.from_brackets(brackets)
+
+    assert tax_rate_api.calculate_tax(15000, brackets) == pytest.approx(2000)
+    assert tax_rate_api.calculate_tax(15000, table) == pytest.approx(2000)
+
+
+def test_batch_matches_single_endpoints(client):
+    records = [
+        {"income": 50000},
+        {"income": 120000, "state": "ny", "filing_status": "married_joint"},
+        {"income": "75000.5", "state": "CA", "year": "2024"},
+    ]
+    results = client.post('/api/calculate/batch', json=records).get_json()['results']
+
+    assert results[0] == client.get('/api/calculate/federal?income=50000').get_json()
+    assert results[1] == client.get('/api/calculate/state?state=NY&income=120000&filing_status=married_joint').get_json()
+    assert results[2] == client.get('/api/calculate/state?state=CA&income=75000.5').get_json()
+
+
+def test_batch_reports_errors_per_record(client):
+    records = [{"income": 50000, "state": "ZZ"}, "not a record", {"income": True}, {"income": 1000}]
+    results = client.post('/api/calculate/batch', json={"records": records}).get_json()['results']
+
+    assert results[0] == {"error": "State ZZ not found"}
+    assert 'error' in results[1] and 'error' in results[2]
+    assert results[3]['tax_amount'] > 0
+
+
+
+def test_concurrent_identical_batches_are_coalesced(client, tax_rate_api, monkeypatch):
+    calculate_records = tax_rate_api.calculate_records
+    started = threading.Event()
+    calls = []
+
+    def slow_calculate_records(snapshot, records):
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return calculate_records(snapshot, records)
+
+    monkeypatch.setattr(tax_rate_api, 'calculate_records', slow_calculate_records)
+    records = [{"income": 50000}, {"income": 60000, "state": "CA"}]
+    responses = []
+
+    def post():
+        responses.append(tax_rate_api.app.test_client().post('/api/calculate/batch', json=records))
+
+    first = threading.Thread(target=post)
+    first.start()
+    started.wait(5)
+    others = [threading.Thread(target=post) for _ in range(3)]
+    for thread in others:
+        thread.start()
+    for thread in [first] + others:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len({response.get_data() for response in responses}) == 1
+    assert len({id(response) for response in responses}) == 4
+
+def test_batch_rejects_bad_bodies(client, tax_rate_api, monkeypatch):
+    assert client.post('/api/calculate/batch', json={"income": 5}).status_code == 400
+    assert client.post('/api/calculate/batch', data='not json').status_code == 400
+
+    monkeypatch.setattr(tax_rate_api, 'MAX_BATCH_SIZE', 2)
+    assert client.post('/api/calculate/batch', json=[{"income": 1}] * 3).status_code == 413
+
+
+
+def test_stream_ndjson_matches_batch(client, tax_rate_api, monkeypatch):
+    records = [{"income": 1000 * i + 500, "state": "NY" if i % 2 else None} for i in range(7)]
+    records = [{k: v for k, v in record.items() if v is not None} for record in records]
+    expected = client.post('/api/calculate/batch', json=records).get_json()['results']
+
+    # Several chunks, with a blank line and a malformed one in the input
+    monkeypatch.setattr(tax_rate_api, 'STREAM_CHUNK_SIZE', 3)
+    body = '\n'.join(json.dumps(record) for record in records) + '\n\nnot json\n'
+    response = client.post('/api/calculate/stream', data=body)
+
+    assert response.mimetype == 'application/x-ndjson'
+    results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert results[:-1] == expected
+    assert 'error' in results[-1]
+
+
+def test_stream_csv(client):
+    body = 'income,state,year\n50000,CA,2024\n\n60000,,\nabc,CA,2024\n'
+    response = client.post('/api/calculate/stream?format=csv', data=body)
+
+    assert response.mimetype == 'text/csv'
+    rows = response.get_data(as_text=True).splitlines()
+    assert rows[0] == 'state,income,year,filing_status,tax_amount,effective_rate,error'
+    state = client.get('/api/calculate/state?state=CA&income=50000').get_json()
+    assert rows[1].startswith(f"CA,50000.0,2024,single,{state['tax_amount']},")
+    assert rows[2].startswith(',60000.0,2024,single,')
+    assert len(rows) == 4 and rows[3].endswith(',Income is required')
+
+
+def test_stream_csv_without_header(client):
+    response = client.post('/api/calculate/stream', data='70000,2024,married_joint,NY\n', content_type='text/csv')
+    assert response.get_data(as_text=True).splitlines()[1].startswith('NY,70000.0,2024,married_joint,')
+
+
+
+@pytest.mark.parametrize('fmt, body', [
+    ('ndjson', b'{"income": "\xff"}\n{"income": 1000}\n'),
+    ('csv', b'\xff1000,2024\n1000,2024\n'),
+])
+def test_stream_reports_invalid_utf8_per_record(client, fmt, body):
+    response = client.post(f'/api/calculate/stream?format={fmt}', data=body)
+    assert response.status_code == 200
+
+    rows = response.get_data(as_text=True).splitlines()
+    if fmt == 'csv':
+        rows = rows[1:]
+        assert rows[0].endswith(',Income is required')
+        assert rows[1].startswith(',1000.0,2024,single,')
+    else:
+        assert json.loads(rows[0]) == {"error": "Income is required"}
+        assert json.loads(rows[1])['tax_amount'] > 0
+
+def test_stream_rejects_unknown_format(client):
+    assert client.post('/api/calculate/stream?format=xml', data='').status_code == 400
+
+def test_calculate_total(client):
+    body = client.get('/api/calculate/total?state=CA&income=90000&filing_status=married_joint').get_json()
+    federal = client.get('/api/calculate/federal?income=90000&filing_status=married_joint').get_json()
+    state = client.get('/api/calculate/state?state=CA&income=90000&filing_status=married_joint').get_json()
+
+    assert body['federal_tax_amount'] == federal['tax_amount']
+    assert body['state_tax_amount'] == state['tax_amount']
+    assert body['tax_amount'] == pytest.approx(federal['tax_amount'] + state['tax_amount'])
+    assert body['effective_rate'] == pytest.approx(body['tax_amount'] / 90000)
+
+
+def test_calculate_total_marginal_rate(client):
+    # Federal 22% plus California's 9.3% bracket for a single filer
+    body = client.get('/api/calculate/total?state=CA&income=70000').get_json()
+    assert body['marginal_rate'] == pytest.approx(0.22 + 0.093)
+
+
+@pytest.mark.parametrize('url, status', [
+    ('/api/calculate/total?income=50000', 400),
+    ('/api/calculate/total?state=CA', 400),
+    ('/api/calculate/total?state=ZZ&income=50000', 404),
+])
+def test_calculate_total_errors(client, url, status):
+    assert client.get(url).status_code == status
+
+
+
+@pytest.mark.parametrize('scope, calculate', [
+    ('federal', '/api/calculate/federal'),
+    ('state', '/api/calculate/state'),
+    ('total', '/api/calculate/total'),
+])
+def test_gross_income_round_trips(client, scope, calculate):
+    body = client.get(f'/api/calculate/gross/{scope}?state=CA&net=60000&filing_status=married_joint').get_json()
+    assert body['net_income'] == 60000
+
+    check = client.get(f"{calculate}?state=CA&income={body['income']}&filing_status=married_joint").get_json()
+    assert check['tax_amount'] == pytest.approx(body['tax_amount'])
+    assert body['income'] - body['tax_amount'] == pytest.approx(60000)
+    if scope == 'total':
+        assert body['federal_tax_amount'] == pytest.approx(check['federal_tax_amount'])
+
+
+@pytest.mark.parametrize('url, status', [
+    ('/api/calculate/gross/federal', 400),
+    ('/api/calculate/gross/federal?net=0', 400),
+    ('/api/calculate/gross/federal?net=-5000', 400),
+    ('/api/calculate/gross/state?net=50000', 400),
+    ('/api/calculate/gross/total?state=ZZ&net=50000', 404),
+    ('/api/calculate/gross/federal?net=50000&year=1999', 404),
+    ('/api/calculate/gross/other?net=50000', 404),
+])
+def test_gross_income_errors(client, url, status):
+    assert client.get(url).status_code == status
+
+
+def test_calculate_all_states(client):
+    results = client.get('/api/calculate/states?income=80000&filing_status=married_joint').get_json()['results']
+
+    states = client.get('/api/states').get_json()['states']
+    assert [result['state'] for result in results] == [state for state in states if state != 'US']
+    by_state = {result['state']: result for result in results}
+    ny = client.get('/api/calculate/state?state=NY&income=80000&filing_status=married_joint').get_json()
+    assert by_state['NY'] == ny
+
+
+def test_calculate_all_states_sorted(client):
+    ascending = client.get('/api/calculate/states?income=80000&sort=tax').get_json()['results']
+    descending = client.get('/api/calculate/states?income=80000&sort=-tax').get_json()['results']
+
+    taxes = [result['tax_amount'] for result in ascending]
+    assert taxes == sorted(taxes)
+    assert [result['tax_amount'] for result in descending] == sorted(taxes, reverse=True)
+
+
+@pytest.mark.parametrize('url, status', [
+    ('/api/calculate/states', 400),
+    ('/api/calculate/states?income=50000&sort=state', 400),
+    ('/api/calculate/states?income=50000&year=1999', 404),
+])
+def test_calculate_all_states_errors(client, url, status):
+    assert client.get(url).status_code == status
+
+
+def test_calculate_marginal(client, tax_data):
+    brackets = sorted(tax_data[0]['2024']['single'], key=lambda bracket: bracket['bracket'])
+    income = brackets[1]['bracket'] + 100
+    body = client.get(f'/api/calculate/marginal?income={income}').get_json()
+
+    assert body['marginal_rate'] == brackets[1]['rate']
+    assert body['bracket_start'] == brackets[1]['bracket']
+    assert body['bracket_end'] == brackets[2]['bracket']
+    assert body['distance_to_next_bracket'] == pytest.approx(brackets[2]['bracket'] - income)
+    assert body['next_marginal_rate'] == brackets[2]['rate']
+    assert 'state' not in body
+
+
+def test_calculate_marginal_top_bracket(client):
+    body = client.get('/api/calculate/marginal?income=1e9&state=ca').get_json()
+    assert body['state'] == 'CA'
+    assert body['bracket_end'] is None and body['distance_to_next_bracket'] is None
+    assert body['next_marginal_rate'] is None
+
+
+@pytest.mark.parametrize('url, status', [
+    ('/api/calculate/marginal', 400),
+    ('/api/calculate/marginal?income=50000&state=ZZ', 404),
+])
+def test_calculate_marginal_errors(client, url, status):
+    assert client.get(url).status_code == status
+
+
+def test_calculate_results_are_cached_per_dataset(client, store, restore_data):
+    url = '/api/calculate/state?state=CA&income=1000'
+    before = client.get(url).get_json()
+    assert any(key[1] == '/api/calculate/state' for key in current(store).results.entries)
+
+    # A new dataset starts with an empty cache, so updated brackets apply at once
+    state_tax_rates = stored('data/state_tax_rates.json')
+    state_tax_rates['CA']['2024']['single'] = [{"bracket": 0, "rate": 0.5}]
+    write_json_atomic('data/state_tax_rates.json', state_tax_rates)
+    store.watcher.check()
+
+    assert before['tax_amount'] != 500
+    assert client.get(url).get_json()['tax_amount'] == pytest.approx(500)
+
+
+def test_cached_results_ignore_other_parameters(client, store):
+    results = current(store).results
+    client.get('/api/calculate/federal?income=41234')
+    size = results.size
+
+    client.get('/api/calculate/federal?income=41234.0&pad=' + 'x' * 4096)
+    assert results.size == size
+
+def test_bracket_lookups_return_stored_brackets(client, tax_data):
+    federal = client.get('/api/federal/2024/single').get_json()
+    state = client.get('/api/state/ca/2024/married_joint').get_json()
+
+    assert federal['tax_brackets'] == tax_data[0]['2024']['single']
+    assert state['state'] == 'CA'
+    assert state['tax_brackets'] == tax_data[1]['CA']['2024']['married_joint']
+
+
+@pytest.mark.parametrize('url', ['/api/federal/2024/single', '/api/state/NY/2024/single'])
+def test_bracket_lookups_are_conditional(client, url):
+    response = client.get(url)
+    etag = response.headers['ETag']
+
+    again = client.get(url, headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.get_data() == b''
+    assert client.get(url, headers={'If-None-Match': '"stale"'}).status_code == 200
+
+
+
+def test_bracket_lookups_negotiate_gzip(client):
+    plain = client.get('/api/state/CA/2024/married_joint')
+    response = client.get('/api/state/CA/2024/married_joint', headers={'Accept-Encoding': 'gzip, deflate'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.get_data()) == plain.get_data()
+    assert response.headers['ETag'] != plain.headers['ETag']
+
+    again = client.get('/api/state/CA/2024/married_joint',
+                       headers={'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+    assert again.status_code == 304
+    assert 'Content-Encoding' not in plain.headers
+
+
+def test_small_bodies_are_not_compressed(client):
+    response = client.get('/api/federal/1999/single', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    response = client.get('/api/states', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in response.headers
+
+@pytest.mark.parametrize('url, error', [
+    ('/api/federal/1999/single', 'Year 1999 not found'),
+    ('/api/federal/2024/widowed', 'Filing status widowed not found'),
+    ('/api/state/ZZ/2024/single', 'State ZZ not found'),
+])
+def test_bracket_lookup_errors(client, url, error):
+    response = client.get(url)
+    assert response.status_code == 404
+    assert response.get_json() == {"error": error}
+    assert 'ETag' not in response.headers
+
+
+
+def test_rates_batch_matches_lookups(client):
+    keys = [{"year": "2024", "filing_status": "married_joint"}, {"state": "ca"}, {"state": "ZZ"}, "CA"]
+    # Warm one key through the single-key route so the batch reuses its cached body
+    client.get('/api/state/CA/2024/single')
+    results = client.post('/api/rates/batch', json={"keys": keys}).get_json()['results']
+
+    assert results[0] == client.get('/api/federal/2024/married_joint').get_json()
+    assert results[1] == client.get('/api/state/CA/2024/single').get_json()
+    assert results[2] == {"error": "State ZZ not found"}
+    assert 'error' in results[3]
+
+
+def test_rates_batch_rejects_bad_bodies(client, tax_rate_api, monkeypatch):
+    assert client.post('/api/rates/batch', json={"state": "CA"}).status_code == 400
+
+    monkeypatch.setattr(tax_rate_api, 'MAX_BATCH_SIZE', 1)
+    assert client.post('/api/rates/batch', json=[{}, {}]).status_code == 413
+
+def test_metadata(client, tax_data):
+    federal_tax_rates, state_tax_rates = tax_data
+
+    assert client.get('/api/states').get_json() == {"states": list(state_tax_rates)}
+    years = client.get('/api/years').get_json()
+    assert years['federal_years'] == list(federal_tax_rates)
+    assert years['state_years']['CA'] == list(state_tax_rates['CA'])
+
+    home = client.get('/').get_json()
+    assert home['available_years'] == list(federal_tax_rates)
+    assert home['available_states'] == list(state_tax_rates)
+
+
+@pytest.mark.parametrize('url', ['/', '/api/states', '/api/years'])
+def test_metadata_is_conditional(client, url):
+    etag = client.get(url).headers['ETag']
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+
+
+@pytest.mark.parametrize('fmt', ['json', 'bin'])
+def test_snapshot_redirects_to_current_version(client, store, fmt):
+    response = client.get(f'/api/snapshot?format={fmt}')
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith(f'/api/snapshot/{current(store).version}.{fmt}')
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+
+def test_snapshot_json(client, store, tax_data):
+    response = client.get('/api/snapshot', follow_redirects=True)
+    body = response.get_json()
+
+    assert 'immutable' in response.headers['Cache-Control']
+    assert body.keys() == {'version', 'federal', 'states'}
+    assert body['version'] == current(store).version
+    assert body['federal'] == tax_data[0]
+    assert client.get(response.request.path, headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+
+def test_snapshot_bin(client, store):
+    response = client.get(f'/api/snapshot/{current(store).version}.bin')
+    version, tables = unpack_tables(response.get_data())
+
+    assert response.mimetype == 'application/octet-stream'
+    assert version == current(store).version
+    assert tables['CA']['2024']['single'].to_brackets() == current(store).tables['CA']['2024']['single'].to_brackets()
+    etag = response.headers['ETag']
+    assert client.get(response.request.path, headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_snapshot_errors(client):
+    assert client.get('/api/snapshot?format=xml').status_code == 400
+    response = client.get('/api/snapshot/0000.json')
+    assert response.status_code == 404
+    assert 'immutable' not in response.headers.get('Cache-Control', '')
+
+
+def test_changes_since_version(client, store, restore_data):
+    since = current(store).version
+    client.post('/api/update/federal', json=FLAT_FEDERAL)
+    client.post('/api/update/state', json={"ZZ": {"2024": {"single": [{"bracket": 0, "rate": 0.05}]}}})
+
+    body = client.get(f'/api/changes?since={since}').get_json()
+    assert body.keys() == {'since', 'version', 'changes', 'removed'}
+    assert body['since'] == since
+    assert body['version'] == current(store).version
+    assert body['changes'] == [
+        {"state": None, "year": "2030", "filing_status": "single", "tax_brackets": FLAT_FEDERAL['2030']['single']},
+        {"state": "ZZ", "year": "2024", "filing_status": "single", "tax_brackets": [{"bracket": 0, "rate": 0.05}]},
+    ]
+    assert body['removed'] == []
+
+    assert client.get(f'/api/changes?since={current(store).version}').get_json()['changes'] == []
+
+
+def test_changes_list_removed_keys(client, store, restore_data):
+    client.post('/api/update/state', json={"ZZ": {"2024": {"single": [{"bracket": 0, "rate": 0.05}]}}})
+    since = current(store).version
+
+    state_tax_rates = stored('data/state_tax_rates.json')
+    del state_tax_rates['ZZ']
+    write_json_atomic('data/state_tax_rates.json', state_tax_rates)
+    store.watcher.check()
+
+    body = client.get(f'/api/changes?since={since}').get_json()
+    assert body['removed'] == [{"state": "ZZ", "year": "2024", "filing_status": "single"}]
+
+
+def test_changes_errors(client, store):
+    assert client.get('/api/changes').status_code == 400
+
+    response = client.get('/api/changes?since=0000')
+    assert response.status_code == 410
+    assert response.get_json()['version'] == current(store).version
+    assert 'revision' not in response.get_json()
+
+FLAT_FEDERAL = {"2030": {"single": [{"bracket": 0, "rate": 0.1}]}}
+
+
+def stored(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def test_update_federal(client, restore_data):
+    etag = client.get('/api/years').headers['ETag']
+    response = client.post('/api/update/federal', json=FLAT_FEDERAL)
+
+    assert response.status_code == 200
+    assert client.get('/api/calculate/federal?income=1000&year=2030').get_json()['tax_amount'] == pytest.approx(100)
+    assert client.get('/api/federal/2030/single').get_json()['tax_brackets'] == FLAT_FEDERAL['2030']['single']
+    assert client.get('/api/years', headers={'If-None-Match': etag}).status_code == 200
+
+    # Written to disk, merged into the existing years, with no temp files left behind
+    assert stored('data/federal_tax_rates.json')['2030'] == FLAT_FEDERAL['2030']
+    assert '2024' in stored('data/federal_tax_rates.json')
+    assert not [name for name in os.listdir('data') if name.startswith('.tmp-')]
+
+
+def test_update_state(client, restore_data):
+    data = {"ZZ": {"2024": {"single": [{"bracket": 0, "rate": 0.05}]}}}
+    assert client.post('/api/update/state', json=data).status_code == 200
+
+    assert client.get('/api/calculate/state?state=ZZ&income=1000').get_json()['tax_amount'] == pytest.approx(50)
+    assert stored('data/state_tax_rates.json')['ZZ'] == data['ZZ']
+    assert 'CA' in stored('data/state_tax_rates.json')
+
+
+
+def test_update_keeps_other_stored_fields(client, store, restore_data):
+    state_tax_rates = stored('data/state_tax_rates.json')
+    state_tax_rates['NY']['2024']['single'] = [{"bracket": 1000, "rate": 0.05, "label": "first"}]
+    write_json_atomic('data/state_tax_rates.json', state_tax_rates)
+    store.watcher.check()
+    client.post('/api/update/state', json={"ZZ": {"2024": {"single": [{"bracket": 0, "rate": 0.05}]}}})
+
+    assert stored('data/state_tax_rates.json')['NY']['2024']['single'] == [{"bracket": 1000, "rate": 0.05, "label": "first"}]
+
+
+LABELLED = [{"bracket": 20000, "rate": 0.2, "label": "upper"}, {"bracket": 1000, "rate": 0.1, "label": "lower"}]
+
+
+def test_lookups_return_brackets_as_stored(client, store, restore_data):
+    since = current(store).version
+    client.post('/api/update/state', json={"ZZ": {"2024": {"single": LABELLED}}})
+
+    assert client.get('/api/state/ZZ/2024/single').get_json()['tax_brackets'] == LABELLED
+    assert client.post('/api/rates/batch', json=[{"state": "ZZ"}]).get_json()['results'][0]['tax_brackets'] == LABELLED
+    assert client.get('/api/snapshot', follow_redirects=True).get_json()['states']['ZZ'] == {"2024": {"single": LABELLED}}
+    assert client.get(f'/api/changes?since={since}').get_json()['changes'][0]['tax_brackets'] == LABELLED
+
+    # Calculations still sort the brackets by bound
+    tax_amount = client.get('/api/calculate/state?state=ZZ&income=30000').get_json()['tax_amount']
+    assert tax_amount == pytest.approx(calculate_tax(30000, LABELLED))
+
+
+def test_label_changes_are_new_versions(client, store, restore_data):
+    client.post('/api/update/state', json={"ZZ": {"2024": {"single": LABELLED}}})
+    before = current(store).version
+    etag = client.get('/api/state/ZZ/2024/single').headers['ETag']
+
+    relabelled = [dict(bracket, label=bracket["label"].title()) for bracket in LABELLED]
+    client.post('/api/update/state', json={"ZZ": {"2024": {"single": relabelled}}})
+
+    assert current(store).version != before
+    response = client.get('/api/state/ZZ/2024/single', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['tax_brackets'] == relabelled
+    assert client.get(f'/api/changes?since={before}').get_json()['changes'][0]['tax_brackets'] == relabelled
+
+def test_update_leaves_published_data_alone(client, store, restore_data):
+    snapshot = current(store)
+
+    client.post('/api/update/federal', json=FLAT_FEDERAL)
+    assert current(store) is not snapshot
+    assert dataset_version(snapshot.stored) == snapshot.version
+    assert '2030' not in snapshot.tables[FEDERAL]
+
+
+def test_invalid_update_changes_nothing(client, store, restore_data):
+    snapshot = current(store)
+    before = stored('data/federal_tax_rates.json')
+
+    response = client.post('/api/update/federal', json={"2030": {"single": [{"rate": 0.1}]}})
+    assert response.status_code == 500
+    assert current(store) is snapshot
+    assert stored('data/federal_tax_rates.json') == before
+
+
+def test_failed_write_publishes_nothing(client, tax_rate_api, store, restore_data, monkeypatch):
+    def fail(path, data):
+        raise OSError("disk full")
+
+    snapshot = current(store)
+    monkeypatch.setattr(tax_rate_api, 'write_json_atomic', fail)
+
+    response = client.post('/api/update/federal', json=FLAT_FEDERAL)
+    assert response.status_code == 500
+    assert current(store) is snapshot
+    assert client.get('/api/federal/2030/single').status_code == 404
+
+
+def test_update_requires_data(client):
+    assert client.post('/api/update/federal', json={}).status_code == 400
+    assert client.post('/api/update/state', json={}).status_code == 400
+
+
+def test_reloads_files_changed_elsewhere(client, store, restore_data):
+    state_tax_rates = stored('data/state_tax_rates.json')
+    state_tax_rates['CA']['2024']['single'] = [{"bracket": 0, "rate": 0.5}]
+    write_json_atomic('data/state_tax_rates.json', state_tax_rates)
+
+    assert store.watcher.check()
+    assert client.get('/api/calculate/state?state=CA&income=1000').get_json()['tax_amount'] == pytest.approx(500)
+    assert not store.watcher.check()
+
+
+
+def test_updates_keep_changes_made_elsewhere(client, restore_data):
+    # Another worker edits the state file; this process hasn't polled yet
+    state_tax_rates = stored('data/state_tax_rates.json')
+    state_tax_rates['CA']['2024']['single'] = [{"bracket": 0, "rate": 0.5}]
+    write_json_atomic('data/state_tax_rates.json', state_tax_rates)
+    client.post('/api/update/federal', json=FLAT_FEDERAL)
+    assert client.get('/api/calculate/state?state=CA&income=1000').get_json()['tax_amount'] == pytest.approx(500)
+
+    # Another worker edits the federal file, then this one updates the same file
+    federal_tax_rates = stored('data/federal_tax_rates.json')
+    federal_tax_rates['2031'] = FLAT_FEDERAL['2030']
+    write_json_atomic('data/federal_tax_rates.json', federal_tax_rates)
+    client.post('/api/update/federal', json={"2032": FLAT_FEDERAL['2030']})
+
+    assert {'2030', '2031', '2032'} <= stored('data/federal_tax_rates.json').keys()
+    assert client.get('/api/federal/2031/single').status_code == 200
+
+def test_own_updates_are_not_reloaded(client, store, restore_data):
+    store.watcher.check()
+    client.post('/api/update/federal', json=FLAT_FEDERAL)
+    assert not store.watcher.check()
+
+
+def test_metrics(client):
+    client.get('/api/calculate/federal?income=50000')
+    client.get('/api/federal/1999/single')
+
+    response = client.get('/metrics')
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+    assert 'route="calculate_federal_tax",method="GET",status="200"' in text
+    assert 'tax_api_request_errors_total{app="tax_rate_api",route="get_federal_rates",status="404"}' in text
+    assert 'tax_api_cache_requests_total{cache="responses"' in text
+
+
+def test_profile_requires_admin_token(client, monkeypatch):
+    monkeypatch.setattr(tax_http, 'ADMIN_TOKEN', 'secret')
+
+    assert client.get('/api/states', headers={'X-Profile': '1'}).status_code == 403
+    assert client.get('/api/states', headers={'X-Profile': '1', 'X-Admin-Token': 'wrong'}).status_code == 403
+
+    monkeypatch.setattr(tax_http, 'ADMIN_TOKEN', '')
+    assert client.get('/api/states', headers={'X-Profile': '1', 'X-Admin-Token': ''}).status_code == 403
+
+
+def test_profile_saves_stats(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(tax_http, 'ADMIN_TOKEN', 'secret')
+    monkeypatch.setattr(tax_http, 'PROFILE_DIR', str(tmp_path))
+
+    response = client.get('/api/calculate/federal?income=50000', headers={'X-Profile': '1', 'X-Admin-Token': 'secret'})
+    assert response.status_code == 200
+    name = response.headers['X-Profile-File']
+    assert name.startswith('calculate_federal_tax-')
+    assert pstats.Stats(str(tmp_path / name)).total_calls > 0
+
+    assert 'X-Profile-File' not in client.get('/api/calculate/federal?income=50000').headers
+
+
+def test_profile_skips_result_cache(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(tax_http, 'ADMIN_TOKEN', 'secret')
+    monkeypatch.setattr(tax_http, 'PROFILE_DIR', str(tmp_path))
+    url = '/api/calculate/federal?income=61000'
+    cached = client.get(url)
+
+    # The result is cached, but a profiled request still calculates it
+    response = client.get(url, headers={'X-Profile': '1', 'X-Admin-Token': 'secret'})
+    assert response.get_json() == cached.get_json()
+    stats = pstats.Stats(str(tmp_path / response.headers['X-Profile-File']))
+    assert any(function == 'calculate_federal_tax' for _, _, function in stats.stats)
+
+    response = client.post('/api/calculate/batch', json=[{"income": 61000}], headers={'X-Profile': '1', 'X-Admin-Token': 'secret'})
+    assert response.status_code == 200
+    stats = pstats.Stats(str(tmp_path / response.headers['X-Profile-File']))
+    assert any(function == 'calculate_batch' for _, _, function in stats.stats)
+
+
+def test_immutable_bodies_only_depend_on_content(client, store, restore_data):
+    # Publishing A, then B, then A again gives the same snapshot body for A
+    snapshot = client.get('/api/snapshot', follow_redirects=True)
+    original = stored('data/federal_tax_rates.json')
+    client.post('/api/update/federal', json=FLAT_FEDERAL)
+    write_json_atomic('data/federal_tax_rates.json', original)
+    store.watcher.check()
+
+    again = client.get('/api/snapshot', follow_redirects=True)
+    assert again.request.path == snapshot.request.path
+    assert again.get_data() == snapshot.get_data()